@@ -0,0 +1,192 @@
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict
+
+# 엔드포인트별 동시 처리 수 / 대기열 길이 제한
+# 출근 시간대처럼 업로드가 몰리면 대기열이 찬 뒤의 요청은 바로 "N초 후 다시 시도" 로 돌려보내서
+# 이미 받은 요청의 지연 시간이 끝없이 늘어나지 않게 함
+# 대기 시간(슬롯을 기다린 시간)과 처리 시간을 따로 기록해 지연 시간 목표(SLO)에 맞춰 서버 크기를 정할 수 있게 함
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "4"))    # 언어별 단일 업로드 동시 처리 수
+UPLOAD_QUEUE_DEPTH = int(os.environ.get("UPLOAD_QUEUE_DEPTH", "16"))   # 언어별 단일 업로드 대기 수
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "1"))      # 언어별 일괄 업로드 동시 처리 수
+BATCH_QUEUE_DEPTH = int(os.environ.get("BATCH_QUEUE_DEPTH", "2"))      # 언어별 일괄 업로드 대기 수
+SAMPLE_SIZE = 1000  # 백분위 계산에 쓰는 최근 요청 수
+
+
+class Busy(Exception):
+    """The endpoint's queue is full; retry_after is a suggested wait in seconds"""
+
+    def __init__(self, endpoint: str, retry_after: int):
+        super().__init__(f"{endpoint} is busy, retry in {retry_after}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+# Gradio 화면이 Busy 를 사용자에게 보여줄 때 쓰는 언어별 문구 (gr.Error)
+BUSY_MESSAGES = {
+    'korean': "요청이 많아 지금은 처리할 수 없습니다. {seconds}초 후 다시 시도해 주세요.",
+    'english': "The server is busy right now. Please retry in {seconds} s.",
+    'japanese': "ただいま混み合っています。{seconds}秒後にもう一度お試しください。",
+}
+_BUSY_PATTERNS = [re.compile(re.escape(message).replace(re.escape('{seconds}'), r'\d+'))
+                  for message in BUSY_MESSAGES.values()]
+_BUSY_PATTERNS.append(re.compile(r'is busy, retry in \d+s'))
+
+
+def is_busy_message(text: str) -> bool:
+    """True if an error message is a Busy rejection (raw or as shown by the Gradio apps)"""
+    return any(pattern.search(text) for pattern in _BUSY_PATTERNS)
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Admission:
+    """Concurrency limit plus bounded wait queue for one endpoint.
+
+    slot() is for handlers run in worker threads, slot_async() for handlers run
+    on the event loop; a given endpoint should use one of them.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self._lock = threading.Lock()
+        self._semaphore = threading.Semaphore(self.max_concurrency)
+        self._async_semaphore = None  # 첫 비동기 요청 때 이벤트 루프 안에서 생성
+        self._running = 0
+        self._waiting = 0
+        self._waits = deque(maxlen=SAMPLE_SIZE)
+        self._durations = deque(maxlen=SAMPLE_SIZE)
+        self._stats = {
+            'admitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+        }
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from recent processing times"""
+        with self._lock:
+            average = sum(self._durations) / len(self._durations) if self._durations else 1.0
+            return max(1, math.ceil(average * (self._waiting + 1) / self.max_concurrency))
+
+    def _enter(self) -> float:
+        with self._lock:
+            if self._running + self._waiting >= self.max_concurrency + self.max_queue:
+                self._stats['rejected'] += 1
+                full = True
+            else:
+                self._waiting += 1
+                full = False
+        if full:
+            raise Busy(self.name, self.retry_after())
+        return time.perf_counter()
+
+    def _admitted(self, queued_at: float) -> float:
+        started = time.perf_counter()
+        with self._lock:
+            self._waiting -= 1
+            self._running += 1
+            self._stats['admitted'] += 1
+            self._waits.append(started - queued_at)
+        return started
+
+    def _abandoned(self) -> None:
+        # 대기 중에 취소된 요청 (클라이언트 연결 종료 등)
+        with self._lock:
+            self._waiting -= 1
+
+    def _leave(self, started: float, failed: bool) -> None:
+        with self._lock:
+            self._running -= 1
+            self._stats['failed' if failed else 'completed'] += 1
+            self._durations.append(time.perf_counter() - started)
+
+    @contextmanager
+    def slot(self):
+        """Hold one processing slot; raises Busy when the queue is full"""
+        queued_at = self._enter()
+        try:
+            self._semaphore.acquire()
+        except BaseException:
+            self._abandoned()
+            raise
+        started = self._admitted(queued_at)
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._semaphore.release()
+            self._leave(started, failed)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Async variant of slot()"""
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+        queued_at = self._enter()
+        try:
+            await self._async_semaphore.acquire()
+        except BaseException:
+            self._abandoned()
+            raise
+        started = self._admitted(queued_at)
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._async_semaphore.release()
+            self._leave(started, failed)
+
+    def stats(self) -> Dict:
+        """Counters plus queue-wait and processing-time percentiles (seconds)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['running'] = self._running
+            stats['waiting'] = self._waiting
+            waits = list(self._waits)
+            durations = list(self._durations)
+        stats['max_concurrency'] = self.max_concurrency
+        stats['max_queue'] = self.max_queue
+        for label, samples in (('queue_wait', waits), ('processing', durations)):
+            stats[label] = {
+                'p50': round(_percentile(samples, 0.50), 4),
+                'p95': round(_percentile(samples, 0.95), 4),
+                'p99': round(_percentile(samples, 0.99), 4),
+                'max': round(max(samples), 4) if samples else 0.0,
+            }
+        return stats
+
+
+_registry_lock = threading.Lock()
+_registry = {}  # 엔드포인트 이름 -> Admission
+
+
+def get_admission(name: str, max_concurrency: int, max_queue: int) -> Admission:
+    """Admission controller for an endpoint, created on first use"""
+    with _registry_lock:
+        admission = _registry.get(name)
+        if admission is None:
+            admission = _registry[name] = Admission(name, max_concurrency, max_queue)
+        return admission
+
+
+def get_admission_stats() -> Dict:
+    """Per-endpoint admission stats"""
+    with _registry_lock:
+        admissions = list(_registry.values())
+    return {admission.name: admission.stats() for admission in admissions}
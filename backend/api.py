@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import admission
+import events
+import fruit_engine
+import price_table
+import session_store
+
+# 자동화 클라이언트용 JSON API (/api/...)
+# 음성 클라이언트처럼 브라우저를 띄워 Gradio 화면을 긁어올 필요 없이 분류/가격/집계를 바로 조회
+# 분류·가격 조회는 Gradio 화면과 같은 fruit_engine 경로(캐시, 속도 제한 포함)를 사용
+router = APIRouter(prefix="/api")
+
+# 동시 처리 수 / 대기열 제한은 업로드 화면과 같은 설정값 사용
+CLASSIFY_ADMISSION = admission.get_admission('api.classify', admission.UPLOAD_CONCURRENCY, admission.UPLOAD_QUEUE_DEPTH)
+BATCH_ADMISSION = admission.get_admission('api.batch', admission.BATCH_CONCURRENCY, admission.BATCH_QUEUE_DEPTH)
+MAX_BATCH_FILES = 64  # 일괄 분류 한 번에 받는 파일 수 상한
+PRICED_CONDITIONS = ('fr', 'low')  # 'rot' 은 가격 정보 없음
+
+
+def busy_response(e: admission.Busy) -> JSONResponse:
+    return JSONResponse({'error': 'busy', 'retry_after': e.retry_after}, status_code=503,
+                        headers={'Retry-After': str(e.retry_after)})
+
+
+def classification(tag: str) -> Dict:
+    """Compact result for one prediction tag"""
+    if tag.startswith(fruit_engine.ERROR_PREFIX):
+        return {'error': tag[len(fruit_engine.ERROR_PREFIX):]}
+    if '_' not in tag:
+        return {'error': f"unexpected tag {tag}"}
+    product, condition = fruit_engine.fruits_status(tag)
+    return {'tag': tag, 'product': product, 'condition': condition}
+
+
+def record(session_id: Optional[str], tags: List[str], names: List[str]) -> None:
+    """Count predictions into a session so they show up in /api/sessions/{id}/counts"""
+    if not session_id:
+        return
+    session = session_store.get_session(session_id)
+    for tag, name in zip(tags, names):
+        if fruit_engine.record_prediction(session, tag):
+            session.image_read.append(name)
+
+
+@router.post("/classify")
+async def classify(request: Request, session_id: Optional[str] = None):
+    """Classify raw image bytes (request body); pass session_id to count the result"""
+    image = await request.body()
+    if not image:
+        raise HTTPException(status_code=400, detail="empty body, send the image bytes")
+    try:
+        async with CLASSIFY_ADMISSION.slot_async():
+            tag = await fruit_engine.predict_image_async(image)
+    except admission.Busy as e:
+        return busy_response(e)
+
+    result = classification(tag)
+    if 'error' in result:
+        return JSONResponse(result, status_code=502)
+    record(session_id, [tag], [request.headers.get('X-Filename', 'api')])
+    return result
+
+
+@router.post("/classify/batch")
+async def classify_batch(files: List[UploadFile] = File(...), session_id: Optional[str] = None):
+    """Classify several uploaded images in one call (multipart field "files")"""
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"at most {MAX_BATCH_FILES} files per batch")
+    images = [await upload.read() for upload in files]
+    try:
+        async with BATCH_ADMISSION.slot_async():
+            tags = await fruit_engine.classify_images_async(images)
+    except admission.Busy as e:
+        return busy_response(e)
+
+    record(session_id, tags, [upload.filename or 'api' for upload in files])
+    return {'results': [dict(classification(tag), file=upload.filename) for tag, upload in zip(tags, files)]}
+
+
+@router.get("/prices/{product}")
+async def prices(product: str, condition: str = 'fr'):
+    """Wholesale prices by region for one product and condition, as numbers"""
+    api_configs = fruit_engine.get_api_configs()
+    if product not in api_configs['category_dict']:
+        raise HTTPException(status_code=404, detail=f"unknown product {product}")
+    if condition not in PRICED_CONDITIONS:
+        raise HTTPException(status_code=400, detail=f"condition must be one of {', '.join(PRICED_CONDITIONS)}")
+
+    today_date, yesterday_date = fruit_engine.get_date_range()
+    try:
+        data = await fruit_engine.get_price_data_async(product, yesterday_date, today_date)
+        rows = price_table.build_price_records(fruit_engine.price_items(data), condition,
+                                               api_configs['unit_fruit_dict'][product])
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=502)
+    return {
+        'product': product,
+        'condition': condition,
+        'start_date': yesterday_date,
+        'end_date': today_date,
+        'prices': rows,
+    }
+
+
+@router.get("/sessions/{session_id}/counts")
+def session_counts(session_id: str):
+    """Running counts for an API session id or a Gradio session hash"""
+    session = session_store.find_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="unknown session")
+    return {
+        'session_id': session_id,
+        'counts': session.counts(),
+        'priced': list(session.price_dict),
+        'images': len(session.image_read),
+    }
+
+
+@router.get("/sessions/{session_id}/events")
+async def session_events(session_id: str, request: Request, after: Optional[int] = None):
+    """Server-Sent Events stream of classification / prices events for one session.
+
+    Stored events after `after` (or the Last-Event-ID header) are replayed first;
+    a "reset" event means some were dropped and counts should be reloaded.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    if after is None and last_event_id.isdigit():
+        after = int(last_event_id)
+    subscription = events.subscribe(session_id, after)
+
+    async def stream():
+        try:
+            if subscription.gap:
+                yield events.format_sse(events.reset_event(session_id))
+            for event in subscription.backlog:
+                yield events.format_sse(event)
+            while not await request.is_disconnected():
+                event = await subscription.next()
+                if event is not None:
+                    yield events.format_sse(event)
+                elif subscription.lagged:
+                    # 너무 느린 구독자 - 놓친 이벤트가 있으니 reset 후 종료 (클라이언트가 재접속)
+                    events.record_lag()
+                    yield events.format_sse(events.reset_event(session_id))
+                    break
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,105 @@
+# 로컬(export 모델) vs 원격(Custom Vision) 분류 속도 비교
+# 사용법: PREDICTION_BACKEND=local python bench_inference.py <이미지 폴더> [--limit 50] [--workers 8]
+import argparse
+import concurrent.futures
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import http_client
+import image_preprocess
+import local_inference
+from fruit_engine import prediction_request
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+
+def load_images(folder: str, limit: int) -> List[bytes]:
+    paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(VALID_EXTENSIONS))
+    images = []
+    for path in paths[:limit]:
+        with open(path, "rb") as img_file:
+            images.append(img_file.read())
+    return images
+
+
+def remote_predict(image_bytes: bytes) -> str:
+    """Remote call without the prediction cache, so every image hits the endpoint"""
+    url, headers = prediction_request()
+    response = http_client.post(url, headers=headers, data=image_preprocess.preprocess_image(image_bytes))
+    response.raise_for_status()
+    return max(response.json()['predictions'], key=lambda x: x['probability'])['tagName']
+
+
+def measure(name: str, images: List[bytes], run: Callable[[List[bytes]], List[float]]) -> Dict:
+    started = time.perf_counter()
+    latencies = run(images)
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latencies)
+    return {
+        'backend': name,
+        'images': len(images),
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        'images_per_sec': len(images) / elapsed,
+    }
+
+
+def timed(fn: Callable, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def run_remote(workers: int) -> Callable:
+    def run(images: List[bytes]) -> List[float]:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda image: timed(remote_predict, image), images))
+    return run
+
+
+def run_local_single(images: List[bytes]) -> List[float]:
+    return [timed(local_inference.predict_images_local, [image]) for image in images]
+
+
+def run_local_batched(images: List[bytes]) -> List[float]:
+    # 배치 하나의 시간을 배치 안의 이미지 수만큼 나눠서 이미지당 지연으로 기록
+    latencies = []
+    size = local_inference.LOCAL_BATCH_SIZE
+    for start in range(0, len(images), size):
+        chunk = images[start:start + size]
+        seconds = timed(local_inference.predict_images_local, chunk)
+        latencies.extend([seconds / len(chunk)] * len(chunk))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare local and remote classification latency")
+    parser.add_argument("folder")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent remote calls")
+    parser.add_argument("--skip-remote", action="store_true")
+    args = parser.parse_args()
+
+    images = load_images(args.folder, args.limit)
+    if not images:
+        print("❌ No images found in the folder.")
+        return
+
+    results = []
+    if local_inference.get_model() is not None:
+        local_inference.predict_images_local(images[:1])  # 워밍업
+        results.append(measure("local (batch=1)", images, run_local_single))
+        results.append(measure(f"local (batch={local_inference.LOCAL_BATCH_SIZE})", images, run_local_batched))
+    if not args.skip_remote:
+        results.append(measure("remote (sequential)", images, run_remote(1)))
+        results.append(measure(f"remote ({args.workers} workers)", images, run_remote(args.workers)))
+
+    print(f"{'backend':<24}{'images':>8}{'p50 ms':>10}{'p95 ms':>10}{'img/s':>10}")
+    for r in results:
+        print(f"{r['backend']:<24}{r['images']:>8}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['images_per_sec']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
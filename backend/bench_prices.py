@@ -0,0 +1,62 @@
+# 가격 테이블 생성 속도 비교: 기존 df.loc 루프 vs price_table 벡터화 (단건 / 일괄)
+# 사용법: python bench_prices.py [--repeat 200]
+import argparse
+import random
+import timeit
+from typing import Dict, List
+
+import pandas as pd
+
+import price_table
+
+PRODUCTS = ['apple', 'banana', 'carrot', 'cucumber', 'mango', 'bellpepper', 'orange', 'potato', 'strawberry', 'tomato']
+UNITS = {name: '10kg' for name in PRODUCTS}
+COLUMNS = ['Product', 'Condition', 'Region', 'Wholesale Price', 'Unit']
+REGIONS = ['서울', '부산', '대구', '광주', '대전']
+
+
+def fake_price_data(name: str) -> List[Dict]:
+    return [{'itemname': name, 'countyname': region, 'price': f"{random.randint(10000, 90000):,}"}
+            for region in REGIONS]
+
+
+def calculate_prices_loop(price_data: List, fruits_status: str, fruits_name: str) -> pd.DataFrame:
+    """The original row-by-row implementation, kept here as the baseline"""
+    df = pd.DataFrame(columns=COLUMNS)
+    for i in range(5):
+        price = float(price_data[i]['price'].replace(',', ''))
+        if fruits_status == 'low':
+            price = float(f"{price * 0.6}")
+        df.loc[i] = [price_data[i]['itemname'], fruits_status.upper(), price_data[i]['countyname'],
+                     f"{price:,.0f}", UNITS[fruits_name]]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark for price table construction")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    entries = [(fake_price_data(name), status, name) for name in PRODUCTS for status in ('fr', 'low')]
+
+    # 결과가 같은지 먼저 확인
+    expected = pd.concat([calculate_prices_loop(*entry) for entry in entries], ignore_index=True)
+    actual = price_table.build_price_table(entries, COLUMNS, UNITS, upper_status=True)
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual, check_dtype=False)
+
+    cases = {
+        'loop (per product)': lambda: [calculate_prices_loop(*entry) for entry in entries],
+        'vectorized (per product)': lambda: [price_table.build_price_table([entry], COLUMNS, UNITS, upper_status=True)
+                                             for entry in entries],
+        'vectorized (bulk)': lambda: price_table.build_price_table(entries, COLUMNS, UNITS, upper_status=True),
+    }
+    baseline = None
+    print(f"{len(entries)} product/condition tables, {args.repeat} repeats")
+    for name, fn in cases.items():
+        seconds = timeit.timeit(fn, number=args.repeat) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:<28}{seconds * 1000:>10.3f} ms{baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, NamedTuple, Optional
+
+# 세션별 분류/가격 이벤트 채널 (SSE 로 전달)
+# 음성 클라이언트가 "tell me" 때마다 화면 전체를 다시 긁는 대신, 새 결과가 생길 때마다 이벤트를 받아 상태를 유지
+# 채널마다 최근 이벤트 EVENT_REPLAY 개를 보관해서 재접속(Last-Event-ID) 시 놓친 이벤트를 다시 보내줌
+EVENT_REPLAY = int(os.environ.get("EVENT_REPLAY", "100"))          # 채널별 재전송용 보관 이벤트 수
+EVENT_CHANNELS = int(os.environ.get("EVENT_CHANNELS", "1000"))     # 유지할 채널 수 (구독자 없는 오래된 채널부터 정리)
+SUBSCRIBER_QUEUE = int(os.environ.get("EVENT_SUBSCRIBER_QUEUE", "256"))  # 느린 구독자 대기 이벤트 상한
+KEEPALIVE_INTERVAL = 15  # 이벤트가 없을 때 연결 유지용 주석을 보내는 간격 (초)
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    data: Dict
+
+
+class Subscription:
+    """One live listener on a session channel, fed from any thread"""
+
+    def __init__(self, session_id: str, loop: asyncio.AbstractEventLoop):
+        self.session_id = session_id
+        self.backlog: List[Event] = []
+        self.gap = False     # 요청한 위치 이후 이벤트 일부가 이미 보관 범위를 벗어남
+        self.lagged = False  # 대기 이벤트가 SUBSCRIBER_QUEUE 를 넘어서 끊어야 함
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+
+    def _put(self, event: Event) -> None:
+        # 이벤트 루프 스레드에서만 호출
+        if self.lagged:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 이미 쌓인 이벤트를 다 보낸 뒤 reset 을 보내고 연결을 끊음 (클라이언트는 재접속 후 전체 상태 조회)
+            self.lagged = True
+
+    def deliver(self, event: Event) -> bool:
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+            return True
+        except RuntimeError:  # 이벤트 루프 종료
+            return False
+
+    async def next(self, timeout: float = KEEPALIVE_INTERVAL) -> Optional[Event]:
+        """Next event, or None after timeout (send a keepalive then)"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        with _lock:
+            channel = _channels.get(self.session_id)
+            if channel is not None:
+                channel.subscribers.discard(self)
+
+
+class _Channel:
+    __slots__ = ('seq', 'replay', 'subscribers')
+
+    def __init__(self):
+        self.seq = 0
+        self.replay = deque(maxlen=EVENT_REPLAY)
+        self.subscribers = set()
+
+
+_lock = threading.Lock()
+_channels = OrderedDict()  # session_id -> _Channel, 오래 안 쓴 순서
+_stats = {
+    'published': 0,
+    'delivered': 0,
+    'subscriptions': 0,
+    'lagged': 0,
+}
+
+
+def _get_channel(session_id: str) -> _Channel:
+    # _lock 을 잡은 상태에서만 호출
+    channel = _channels.get(session_id)
+    if channel is None:
+        channel = _channels[session_id] = _Channel()
+        if len(_channels) > EVENT_CHANNELS:
+            # 구독자가 없는 가장 오래된 채널부터 정리
+            for old_id in [key for key, old in _channels.items() if not old.subscribers][:len(_channels) - EVENT_CHANNELS]:
+                del _channels[old_id]
+    else:
+        _channels.move_to_end(session_id)
+    return channel
+
+
+def publish(session_id: Optional[str], event_type: str, data: Dict) -> None:
+    """Append an event to the session's channel and push it to live subscribers"""
+    if not session_id:
+        return
+    with _lock:
+        channel = _get_channel(session_id)
+        channel.seq += 1
+        event = Event(channel.seq, event_type, data)
+        channel.replay.append(event)
+        subscribers = list(channel.subscribers)
+        _stats['published'] += 1
+    delivered = 0
+    for subscription in subscribers:
+        if subscription.deliver(event):
+            delivered += 1
+        else:
+            subscription.close()
+    if delivered:
+        with _lock:
+            _stats['delivered'] += delivered
+
+
+def subscribe(session_id: str, after: Optional[int] = None) -> Subscription:
+    """Register a listener; its backlog holds stored events with id > after (all of them if after is None)"""
+    subscription = Subscription(session_id, asyncio.get_running_loop())
+    with _lock:
+        channel = _get_channel(session_id)
+        replay = list(channel.replay)
+        if after is None:
+            subscription.backlog = replay
+        else:
+            subscription.backlog = [event for event in replay if event.id > after]
+            oldest = replay[0].id if replay else channel.seq + 1
+            # 재시작 / 채널 재생성 뒤에는 클라이언트가 본 id 가 현재 seq 보다 클 수 있음 - 이때도 전체 상태를 다시 받게 함
+            subscription.gap = after + 1 < oldest or after > channel.seq
+        channel.subscribers.add(subscription)
+        _stats['subscriptions'] += 1
+    return subscription
+
+
+def format_sse(event: Event) -> str:
+    """Server-Sent Events wire format"""
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+
+def reset_event(session_id: str) -> Event:
+    """Tells the client to reload full state (GET /api/sessions/{id}/counts) before continuing"""
+    with _lock:
+        channel = _channels.get(session_id)
+        seq = channel.seq if channel is not None else 0
+    return Event(seq, 'reset', {'session_id': session_id})
+
+
+def record_lag() -> None:
+    with _lock:
+        _stats['lagged'] += 1
+
+
+def get_event_stats() -> Dict:
+    with _lock:
+        stats = dict(_stats)
+        stats['channels'] = len(_channels)
+        stats['subscribers'] = sum(len(channel.subscribers) for channel in _channels.values())
+    stats['replay'] = EVENT_REPLAY
+    return stats
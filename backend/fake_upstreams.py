@@ -0,0 +1,144 @@
+# KAMIS / Custom Vision 대역 서버 (오프라인 부하 테스트용)
+# 지연 시간, 오류율, 429 비율을 조절할 수 있음
+# 사용법: python fake_upstreams.py [--port 9000] [--kamis-latency 0.2] [--vision-latency 0.3] [--vision-error-rate 0.01]
+# 서비스 쪽 환경변수:
+#   KAMIS_API_URL="http://127.0.0.1:9000/service/price/xml.do?action=periodWholesaleProductList"
+#   CUSTOM_VISION_ENDPOINT="http://127.0.0.1:9000" CUSTOM_VISION_PROJECT_ID=fake CUSTOM_VISION_MODEL_NAME=fake
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# KAMIS 품목 코드 -> 품목명 (fruit_engine.get_api_configs 의 fruit_code_dict 와 같은 코드)
+ITEM_NAMES = {'411': '사과', '418': '바나나', '232': '당근', '223': '오이', '428': '망고',
+              '256': '파프리카', '421': '오렌지', '152': '감자', '226': '딸기', '225': '토마토'}
+PRODUCTS = ['apple', 'banana', 'carrot', 'cucumber', 'mango', 'bellpepper', 'orange', 'potato', 'strawberry', 'tomato']
+CONDITIONS = ['fr', 'low', 'rot']
+# fruits_price 가 item[5:14:2] 를 쓰므로 앞의 5행 뒤에 지역별로 (이전, 최근) 2행씩 배치
+SUMMARY_ROWS = ['평균', '평년', '최고값', '최저값', '등락률']
+REGIONS = ['서울', '부산', '대구', '광주', '대전']
+
+
+class Upstream:
+    """Latency and failure knobs plus counters for one fake upstream"""
+
+    def __init__(self, name: str, latency: float, jitter: float, error_rate: float, throttle_rate: float,
+                 retry_after: int):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    async def respond(self, build) -> JSONResponse:
+        self._count('requests')
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        roll = random.random()
+        if roll < self.throttle_rate:
+            self._count('throttled')
+            return JSONResponse({'error': 'Too Many Requests'}, status_code=429,
+                                headers={'Retry-After': str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            self._count('errors')
+            return JSONResponse({'error': 'Injected failure'}, status_code=500)
+        self._count('ok')
+        return JSONResponse(build())
+
+
+def kamis_items(item_code: str, start_date: str, end_date: str) -> List[Dict]:
+    """KAMIS-shaped rows with stable prices per product and region"""
+    item_name = ITEM_NAMES.get(item_code, '사과')
+    base = 10000 + int(hashlib.md5(item_code.encode()).hexdigest(), 16) % 40000
+    rows = []
+    for county in SUMMARY_ROWS:
+        rows.append({'itemname': item_name, 'kindname': '', 'countyname': county, 'marketname': '',
+                     'yyyy': end_date[:4], 'regday': end_date[5:].replace('-', '/'), 'price': f"{base:,}"})
+    for i, county in enumerate(REGIONS):
+        for day, step in ((start_date, 0), (end_date, 1)):
+            price = base + (i + 1) * 370 + step * 120
+            rows.append({'itemname': item_name, 'kindname': '', 'countyname': county, 'marketname': '',
+                         'yyyy': day[:4], 'regday': day[5:].replace('-', '/'), 'price': f"{price:,}"})
+    return rows
+
+
+def vision_predictions(image: bytes) -> List[Dict]:
+    """Deterministic Custom Vision-shaped predictions keyed on the image bytes"""
+    digest = int(hashlib.sha256(image).hexdigest(), 16)
+    tags = [f"{product}_{condition}" for product in PRODUCTS for condition in CONDITIONS]
+    top = digest % len(tags)
+    predictions = []
+    for i, tag in enumerate(tags):
+        probability = 0.9 if i == top else 0.1 / (len(tags) - 1)
+        predictions.append({'probability': probability, 'tagId': str(uuid.UUID(int=i)), 'tagName': tag})
+    return sorted(predictions, key=lambda p: p['probability'], reverse=True)
+
+
+def create_app(kamis: Upstream, vision: Upstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/service/price/xml.do")
+    async def kamis_prices(request: Request):
+        params = request.query_params
+        return await kamis.respond(lambda: {
+            'condition': [dict(params)],
+            'data': {'error_code': '000',
+                     'item': kamis_items(params.get('p_itemcode', ''), params.get('p_startday', ''),
+                                         params.get('p_endday', ''))},
+        })
+
+    @app.post("/customvision/v3.0/Prediction/{project_id}/classify/iterations/{model_name}/image")
+    async def classify(project_id: str, model_name: str, request: Request):
+        image = await request.body()
+        return await vision.respond(lambda: {
+            'id': str(uuid.uuid4()),
+            'project': project_id,
+            'iteration': model_name,
+            'created': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'predictions': vision_predictions(image),
+        })
+
+    @app.get("/fake/stats")
+    def stats():
+        return {'kamis': dict(kamis.counts), 'custom_vision': dict(vision.counts)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake KAMIS and Custom Vision servers for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    for prefix, latency in (("kamis", 0.2), ("vision", 0.3)):
+        parser.add_argument(f"--{prefix}-latency", type=float, default=latency, help="mean response time (s)")
+        parser.add_argument(f"--{prefix}-jitter", type=float, default=latency / 4, help="latency std dev (s)")
+        parser.add_argument(f"--{prefix}-error-rate", type=float, default=0.0, help="share of 500 responses")
+        parser.add_argument(f"--{prefix}-throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    kamis = Upstream('kamis', args.kamis_latency, args.kamis_jitter, args.kamis_error_rate,
+                     args.kamis_throttle_rate, args.retry_after)
+    vision = Upstream('custom_vision', args.vision_latency, args.vision_jitter, args.vision_error_rate,
+                      args.vision_throttle_rate, args.retry_after)
+    uvicorn.run(create_app(kamis, vision), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+import asyncio
+import concurrent.futures
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+import events
+import http_client
+import image_preprocess
+import local_inference
+import metrics
+import prediction_cache
+import price_store
+import price_table
+import session_store
+import shared_cache
+from session_store import SessionState
+from ttl_cache import TTLCache
+
+# 분류/가격 조회/캐시를 담당하는 공통 엔진
+# 한국어/일본어/영어 Gradio 앱은 Locale(표시용 문구/번역표)만 다르고 이 모듈을 함께 사용하므로
+# /korean, /japanese, /english 가 같은 캐시와 같은 KAMIS/Custom Vision 호출을 공유함
+
+# 외부 API 주소와 키 - 배포 환경별로 환경변수로 지정 (부하 테스트 때는 fake_upstreams.py 주소로 교체)
+KAMIS_API_URL = os.environ.get("KAMIS_API_URL",
+                               "http://www.kamis.or.kr/service/price/xml.do?action=periodWholesaleProductList")
+KAMIS_CERT_KEY = os.environ.get("KAMIS_CERT_KEY", "")
+KAMIS_CERT_ID = os.environ.get("KAMIS_CERT_ID", "5318")
+CUSTOM_VISION_ENDPOINT = os.environ.get("CUSTOM_VISION_ENDPOINT", "").rstrip('/')
+CUSTOM_VISION_PREDICTION_KEY = os.environ.get("CUSTOM_VISION_PREDICTION_KEY", "")
+CUSTOM_VISION_PROJECT_ID = os.environ.get("CUSTOM_VISION_PROJECT_ID", "")
+CUSTOM_VISION_MODEL_NAME = os.environ.get("CUSTOM_VISION_MODEL_NAME", "")
+
+# 캐시를 위한 전역 변수
+CACHE_TIMEOUT = 3600  # 1시간
+PRICE_CACHE_SIZE = 64  # 품목 x 날짜 범위 조합 수 상한
+# 단조 시계 기반 TTL + 동시 미스 요청 병합 (KAMIS 호출은 키당 한 번)
+# 미스가 나면 shared_cache 를 거쳐서 워커 프로세스가 여럿이어도 KAMIS 호출은 키당 한 번
+price_cache = TTLCache(ttl=CACHE_TIMEOUT, maxsize=PRICE_CACHE_SIZE, name='price')
+
+# 일괄 업로드 시 동시에 실행할 Custom Vision 호출 수 상한
+BATCH_MAX_WORKERS = 8
+
+# predict_image 가 실패했을 때 돌려주는 결과의 접두어
+ERROR_PREFIX = "Error: "
+
+
+class Locale(NamedTuple):
+    """Display strings and translation tables for one language UI"""
+    price_columns: List[str]            # 품목, 상태, 지역, 도매가격, 단위
+    count_columns: List[str]            # 품목, 품질, 개수
+    product_names: Dict[str, str]       # 'apple' -> 개수 테이블 표시명
+    condition_names: Dict[str, str]     # 'fr' -> 개수 테이블 표시명
+    units: Dict[str, str]               # 'apple' -> 판매 단위
+    product_translations: Optional[Dict[str, str]] = None  # KAMIS 품목명 -> 표시명
+    region_translations: Optional[Dict[str, str]] = None   # KAMIS 지역명 -> 표시명
+    status_translations: Optional[Dict[str, str]] = None   # 'fr' -> 가격 테이블 표시명
+    upper_status: bool = False
+    name: str = ''                      # 지표 라벨용 언어 이름
+
+
+# 날짜 계산 함수
+def get_date_range():
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+    before_yesterday = (now - timedelta(days=2)).strftime("%Y-%m-%d")
+
+    # 서버의 당일 데이터 업로드 시간 13:30 을 고려하여 14를 기점으로 날짜 지정
+    # 서버 api가 하루만 데이터를 불러오기가 안되는 문제로 인하여 이틀(오늘-어제/어제-그제)씩 날짜 저장
+    if now.hour > 14:
+        return today, yesterday
+    return yesterday, before_yesterday
+
+# API 정보를 캐싱하여 사용 (효율화)
+@lru_cache(maxsize=32)
+def get_api_configs() -> Dict:
+
+    return {
+        'category_dict': {'apple': '400', 'banana': '400', 'carrot': '200', 'cucumber': '200',
+                         'mango': '400', 'bellpepper': '200', 'orange': '400', 'potato': '100',
+                         'strawberry': '200', 'tomato': '200'},
+        'fruit_code_dict': {'apple': '411', 'banana': '418', 'carrot': '232', 'cucumber': '223',
+                           'mango': '428', 'bellpepper': '256', 'orange': '421', 'potato': '152',
+                           'strawberry': '226', 'tomato': '225'},
+        'kind_code_dict': {'apple': '05', 'banana': '02', 'carrot': '01', 'cucumber': '02',
+                          'mango': '00', 'bellpepper': '00', 'orange': '03', 'potato': '01',
+                          'strawberry': '00', 'tomato': '00'},
+        'unit_fruit_dict': {'apple': '10kg', 'banana': '13kg', 'carrot': '20kg', 'cucumber': '100개',
+                           'mango': '5kg', 'bellpepper': '5kg', 'orange': '18kg', 'potato': '20kg',
+                           'strawberry': '2kg', 'tomato': '5kg'}
+    }
+
+def fruits_status(prediction: str) -> Tuple[str, str]:
+    """과일 상태 확인 함수 최적화"""
+    name, status = prediction.split('_')
+    return name, status
+
+# kamis 데이터베이스에서 원하는 데이터 요청하는 함수
+def kamis_request(fruits_name: str, start_date: str, end_date: str) -> Tuple[str, Dict, Dict]:
+
+    api_configs = get_api_configs()
+
+    api_url = KAMIS_API_URL
+    api_key = KAMIS_CERT_KEY
+
+    params = {
+        'p_cert_key': api_key,
+        'p_cert_id': KAMIS_CERT_ID,
+        'p_returntype': 'json',
+        'p_startday': start_date,
+        'p_endday': end_date,
+        'p_itemcategorycode': api_configs['category_dict'][fruits_name],
+        'p_itemcode': api_configs['fruit_code_dict'][fruits_name],
+        'p_kindcode': api_configs['kind_code_dict'][fruits_name],
+        'p_productrankcode': '05'
+    }
+
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': api_key
+    }
+
+    return api_url, headers, params
+
+# KAMIS 호출 (JSON 반환) - 캐시는 get_price_data 의 price_cache 에서 담당
+@metrics.timed(metrics.GET_FRUIT_PRICE_SECONDS)
+def get_fruit_price(fruits_name: str, start_date: str, end_date: str) -> Dict:
+    api_url, headers, params = kamis_request(fruits_name, start_date, end_date)
+    response = http_client.post(api_url, headers=headers, params=params, limiter='kamis')
+    response.raise_for_status()
+    return response.json()
+
+# 비동기 경로용 KAMIS 호출 (JSON 반환)
+@metrics.timed(metrics.GET_FRUIT_PRICE_SECONDS)
+async def get_fruit_price_async(fruits_name: str, start_date: str, end_date: str) -> Dict:
+    api_url, headers, params = kamis_request(fruits_name, start_date, end_date)
+    response = await http_client.async_post(api_url, headers=headers, params=params, limiter='kamis')
+    response.raise_for_status()
+    return response.json()
+
+# 공유 캐시 키
+def price_key(fruits_name: str, start_date: str, end_date: str) -> str:
+    return f"price:{fruits_name}:{start_date}:{end_date}"
+
+# 가격 원본 데이터 조회 - 스냅샷 저장소 -> price_cache -> 공유 캐시 -> KAMIS 순
+def get_price_data(fruits_name: str, start_date: str, end_date: str) -> Dict:
+
+    # 사전 조회된 스냅샷이 있으면 KAMIS 를 기다리지 않고 바로 사용
+    data = price_store.get_snapshot(fruits_name, start_date, end_date)
+    if data is None:
+        def fetch():
+            data = get_fruit_price(fruits_name, start_date, end_date)
+            price_store.save_snapshot(fruits_name, start_date, end_date, data)
+            return data
+
+        def load():
+            return shared_cache.get_or_load(price_key(fruits_name, start_date, end_date), CACHE_TIMEOUT, fetch)
+
+        data = price_cache.get_or_load((fruits_name, start_date, end_date), load)
+    return data
+
+# 가격 원본 데이터 조회 (비동기) - 스냅샷 저장소와 price_cache 는 동기 경로와 공유
+async def get_price_data_async(fruits_name: str, start_date: str, end_date: str) -> Dict:
+
+    # 스냅샷 저장소는 SQLite - 이벤트 루프를 막지 않도록 작업 스레드에서 조회/저장
+    data = await asyncio.to_thread(price_store.get_snapshot, fruits_name, start_date, end_date)
+    if data is None:
+        async def fetch():
+            data = await get_fruit_price_async(fruits_name, start_date, end_date)
+            await asyncio.to_thread(price_store.save_snapshot, fruits_name, start_date, end_date, data)
+            return data
+
+        async def load():
+            return await shared_cache.get_or_load_async(price_key(fruits_name, start_date, end_date),
+                                                        CACHE_TIMEOUT, fetch)
+
+        data = await price_cache.get_or_load_async((fruits_name, start_date, end_date), load)
+    return data
+
+# 가격 원본에서 조회에 쓰는 행 (지역별 1행)
+def price_items(data: Dict) -> List:
+    return data['data']['item'][5:14:2]
+
+# 가격 계산 함수
+@metrics.timed(metrics.CALCULATE_PRICES_SECONDS)
+def calculate_prices(locale: Locale, price_data: List, fruits_status: str, fruits_name: str) -> pd.DataFrame:
+    return calculate_prices_bulk(locale, [(price_data, fruits_status, fruits_name)])
+
+# 여러 품목/상태의 가격 테이블을 한 번에 계산
+def calculate_prices_bulk(locale: Locale, entries: List[Tuple[List, str, str]]) -> pd.DataFrame:
+    return price_table.build_price_table(entries, locale.price_columns, locale.units,
+                                         product_names=locale.product_translations,
+                                         region_names=locale.region_translations,
+                                         status_names=locale.status_translations,
+                                         upper_status=locale.upper_status)
+
+# 가격 정보 조회 함수
+def fruits_price(locale: Locale, fruits_name: str, fruits_status: str, start_date: str, end_date: str) -> pd.DataFrame:
+    data = get_price_data(fruits_name, start_date, end_date)
+    price_data = price_items(data)
+    return calculate_prices(locale, price_data, fruits_status, fruits_name)
+
+# 가격 정보 조회 함수 (비동기)
+async def fruits_price_async(locale: Locale, fruits_name: str, fruits_status: str, start_date: str, end_date: str) -> pd.DataFrame:
+    data = await get_price_data_async(fruits_name, start_date, end_date)
+    price_data = price_items(data)
+    return calculate_prices(locale, price_data, fruits_status, fruits_name)
+
+# Custom Vision 예측 URL 과 헤더
+def prediction_request() -> Tuple[str, Dict]:
+    endpoint = CUSTOM_VISION_ENDPOINT
+    prediction_key = CUSTOM_VISION_PREDICTION_KEY
+    project_id = CUSTOM_VISION_PROJECT_ID
+    model_name = CUSTOM_VISION_MODEL_NAME
+
+    url = f"{endpoint}/customvision/v3.0/Prediction/{project_id}/classify/iterations/{model_name}/image"
+
+    headers = {
+        'Prediction-Key': prediction_key,
+        'Content-Type': 'application/octet-stream'
+    }
+
+    return url, headers
+
+## CustomVision으로 생성한 모델 API를 이용해 분류 함수 생성
+@metrics.timed(metrics.PREDICT_IMAGE_SECONDS)
+def predict_image(image_data) :
+
+    url, headers = prediction_request()
+
+    # 로컬 모델이 설정되어 있으면 먼저 사용하고, 실패하면 원격 엔드포인트 호출
+    local_tag = local_inference.try_predict_local(image_data)
+    if local_tag is not None:
+        return local_tag
+
+    # 같은 이미지는 내용 해시로 캐시된 결과 사용
+    cache_key = prediction_cache.image_key(image_data)
+    cached = prediction_cache.get_prediction(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        image_data = image_preprocess.preprocess_image(image_data)
+        response = http_client.post(url, headers=headers, data=image_data, limiter='custom_vision')
+        response.raise_for_status()
+        predictions = response.json()['predictions']
+        # 상위 1개 예측 결과 선택
+        top_prediction = max(predictions, key=lambda x: x['probability'])
+        prediction_cache.put_prediction(cache_key, top_prediction['tagName'])
+
+        return top_prediction['tagName']  # 태그 이름 그대로 반환
+
+    except Exception as e:
+        return f"{ERROR_PREFIX}{str(e)}"
+
+# 분류 함수 (비동기)
+@metrics.timed(metrics.PREDICT_IMAGE_SECONDS)
+async def predict_image_async(image_data: bytes) -> str:
+    url, headers = prediction_request()
+
+    # 로컬 모델이 설정되어 있으면 먼저 사용하고, 실패하면 원격 엔드포인트 호출
+    if local_inference.LOCAL_BACKEND:
+        local_tag = await asyncio.to_thread(local_inference.try_predict_local, image_data)
+        if local_tag is not None:
+            return local_tag
+
+    # 같은 이미지는 내용 해시로 캐시된 결과 사용
+    cache_key = prediction_cache.image_key(image_data)
+    cached = await prediction_cache.get_prediction_async(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        image_data = await image_preprocess.preprocess_image_async(image_data)
+        response = await http_client.async_post(url, headers=headers, content=image_data,
+                                                 limiter='custom_vision')
+        response.raise_for_status()
+        predictions = response.json()['predictions']
+        top_prediction = max(predictions, key=lambda x: x['probability'])
+        await prediction_cache.put_prediction_async(cache_key, top_prediction['tagName'])
+
+        return top_prediction['tagName']
+
+    except Exception as e:
+        return f"{ERROR_PREFIX}{str(e)}"
+
+# 예측 결과 하나를 개수와 가격 조회 대상에 반영 - 분류 실패("Error: ...")는 집계하지 않음
+def record_prediction(session: SessionState, prediction: str) -> bool:
+
+    if prediction.startswith(ERROR_PREFIX) or '_' not in prediction:
+        print(f"Prediction skipped: {prediction}")
+        return False
+
+    fruit_name, fruit_status = fruits_status(prediction)
+    with session.lock:
+        session.fruit_count[prediction] = session.fruit_count.get(prediction, 0) + 1
+
+        # 가격정보가 중복으로 누적되는걸 방지하기 위해 키값으로 dictionary에 저장
+        if fruit_status.lower() in ('fr', 'low'):
+            session.price_dict[prediction] = True
+        counts = dict(session.fruit_count)
+
+    # 구독 중인 클라이언트(SSE)에 새 결과와 누적 개수 전달
+    events.publish(session.session_id, 'classification', {
+        'tag': prediction,
+        'product': fruit_name,
+        'condition': fruit_status,
+        'counts': counts,
+    })
+    return True
+
+# 누적 개수로 개수 테이블 생성
+def build_count_df(locale: Locale, session: SessionState) -> pd.DataFrame:
+
+    product_col, quality_col, count_col = locale.count_columns
+    count_data = [
+    {
+        product_col: locale.product_names[k.split('_')[0]],
+        quality_col: locale.condition_names[k.split('_')[1]],
+        count_col: v
+    }
+    for k, v in session.counts().items()
+]
+    return pd.DataFrame(count_data)
+
+# 새로 조회한 품목의 가격 행을 구독 중인 클라이언트에 전달
+def publish_price_tables(locale: Locale, session: SessionState, new_keys: List[str], new_dfs: List[pd.DataFrame]) -> None:
+    if new_keys:
+        events.publish(session.session_id, 'prices', {
+            'language': locale.name,
+            'products': list(new_keys),
+            'rows': [row for df in new_dfs for row in df.to_dict('records')],
+        })
+
+# 가격 테이블 생성 - 새로 등장한 품목만 조회하고 나머지는 날짜 범위가 바뀔 때까지 재사용
+def build_price_tables(locale: Locale, session: SessionState, start_date: str, end_date: str) -> Tuple[List, pd.DataFrame]:
+    def process_fruit(key):
+        fruit_name, fruit_status = key.split('_')
+        return fruits_price(locale, fruit_name, fruit_status, start_date, end_date)
+
+    new_keys = session.pending_price_keys(start_date, end_date)
+    if len(new_keys) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            new_dfs = list(executor.map(process_fruit, new_keys))
+    else:
+        new_dfs = [process_fruit(key) for key in new_keys]
+
+    publish_price_tables(locale, session, new_keys, new_dfs)
+    return session.add_price_tables(dict(zip(new_keys, new_dfs)), start_date, end_date)
+
+# 가격 테이블 생성 (비동기) - 새 품목 조회를 동시에 진행
+async def build_price_tables_async(locale: Locale, session: SessionState, start_date: str, end_date: str) -> Tuple[List, pd.DataFrame]:
+    tasks = []
+    new_keys = session.pending_price_keys(start_date, end_date)
+    for key in new_keys:
+        fruit_name, fruit_status = key.split('_')
+        tasks.append(fruits_price_async(locale, fruit_name, fruit_status, start_date, end_date))
+
+    new_dfs = await asyncio.gather(*tasks)
+
+    publish_price_tables(locale, session, new_keys, new_dfs)
+    return session.add_price_tables(dict(zip(new_keys, new_dfs)), start_date, end_date)
+
+# 업로드된 파일 읽기
+def read_image_file(image: str) -> bytes:
+    with open(image, "rb") as img_file:
+        return img_file.read()
+
+# 업로드된 파일 하나를 읽어서 분류
+def classify_image_file(image: str) -> str:
+    return predict_image(read_image_file(image))
+
+# 여러 이미지(바이트) 분류 (비동기) - 로컬 모델이면 배치 추론, 아니면 원격 호출을 BATCH_MAX_WORKERS 개씩 동시에
+async def classify_images_async(images: List[bytes]) -> List[str]:
+    if local_inference.LOCAL_BACKEND:
+        try:
+            return await asyncio.to_thread(local_inference.predict_images_local, images)
+        except Exception as e:
+            print(f"Local batch inference failed, falling back to remote: {e}")
+
+    semaphore = asyncio.Semaphore(BATCH_MAX_WORKERS)
+
+    async def classify(image: bytes) -> str:
+        async with semaphore:
+            return await predict_image_async(image)
+
+    return list(await asyncio.gather(*(classify(image) for image in images)))
+
+# 여러 파일 분류 - 로컬 모델이면 배치 단위로 한 번에 추론, 아니면 원격 호출을 동시에 진행
+def classify_image_files(images: List[str]) -> List[str]:
+    predictions = local_inference.try_predict_local_files(images)
+    if predictions is None:
+        # 동시 호출 수를 BATCH_MAX_WORKERS 로 제한
+        max_workers = min(BATCH_MAX_WORKERS, len(images))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            predictions = list(executor.map(classify_image_file, images))
+    return predictions
+
+async def upload_to_do_async(locale: Locale, image: str, session_id: str) -> Tuple:
+    """업로드 처리 함수 (비동기) - 파일 읽기, 분류, 가격 조회 모두 이벤트 루프에서 대기"""
+    with metrics.track_upload(locale.name, 'async'):
+        session = session_store.get_session(session_id)
+        today_date, yesterday_date = get_date_range()
+
+        image_bytes = await asyncio.to_thread(read_image_file, image)
+        prediction = await predict_image_async(image_bytes)
+        record_prediction(session, prediction)
+        session.image_read.append(image)
+
+        all_dfs, combined_df = await build_price_tables_async(locale, session, yesterday_date, today_date)
+
+        return list(session.image_read), all_dfs, build_count_df(locale, session), combined_df
+
+def upload_batch_to_do(locale: Locale, images: List[str], session_id: str) -> Tuple:
+    """여러 장을 동시에 분류한 뒤 테이블은 한 번만 갱신"""
+    with metrics.track_upload(locale.name, 'batch'):
+        session = session_store.get_session(session_id)
+        today_date, yesterday_date = get_date_range()
+
+        predictions = classify_image_files(images) if images else []
+
+        for image, prediction in zip(images or [], predictions):
+            record_prediction(session, prediction)
+            session.image_read.append(image)
+
+        all_dfs, combined_df = build_price_tables(locale, session, yesterday_date, today_date)
+
+        return list(session.image_read), all_dfs, build_count_df(locale, session), combined_df
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+import rate_limiter
+
+# Custom Vision / KAMIS 호출이 공유하는 프로세스 전역 커넥션 풀
+# 모든 값은 배포 환경별로 환경변수로 조정 가능
+POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "4"))   # 호스트별 풀 개수
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "32"))          # 호스트당 keep-alive 연결 수
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "20"))
+MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", "0.5"))    # 0.5s, 1s, 2s ...
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# 429 는 urllib3 가 아니라 post() 에서 직접 재시도 (Retry-After 를 속도 제한기에 반영하기 위해)
+ADAPTER_RETRY_STATUS = tuple(status for status in RETRY_STATUS if status != 429)
+
+_session = None
+_session_lock = threading.Lock()
+
+# 비동기 경로용 클라이언트 (이벤트 루프 하나에서만 사용)
+_async_client = None
+
+
+def _build_session() -> requests.Session:
+    """Create a session with a bounded connection pool and retry policy"""
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=ADAPTER_RETRY_STATUS,
+        allowed_methods=None,  # both upstreams are read-only lookups, so POST is safe to retry
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                          max_retries=retry, pool_block=True)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def post(url: str, timeout: Optional[Tuple[float, float]] = None, limiter: Optional[str] = None,
+         **kwargs) -> requests.Response:
+    """POST through the shared pool with (connect, read) timeouts.
+
+    limiter names a rate_limiter bucket; calls then wait for a token and 429
+    responses slow that bucket down for Retry-After before retrying. It is also
+    the upstream label on the request metrics.
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    upstream = limiter or 'other'
+    bucket = rate_limiter.get_limiter(limiter)
+    for attempt in range(MAX_RETRIES + 1):
+        if bucket is not None:
+            bucket.acquire()
+        with metrics.UPSTREAM_IN_FLIGHT.track_inprogress(upstream=upstream):
+            try:
+                response = get_session().post(url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                metrics.record_upstream(upstream, type(e).__name__)
+                raise
+        metrics.record_upstream(upstream, response.status_code)
+        if response.status_code != 429:
+            if bucket is not None:
+                bucket.on_success()
+            return response
+        if attempt == MAX_RETRIES:
+            return response
+        delay = _retry_delay(response, attempt)
+        if bucket is not None:
+            bucket.on_throttle(delay)  # 다음 acquire() 가 delay 만큼 기다림
+        else:
+            time.sleep(delay)
+
+
+def close_session() -> None:
+    """Close pooled connections (used on shutdown)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared async client, creating it on first use"""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                                max_keepalive_connections=POOL_MAXSIZE),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+    return _async_client
+
+
+def _retry_delay(response, attempt: int) -> float:
+    """Backoff before the next attempt, preferring the server's Retry-After"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+
+async def async_post(url: str, limiter: Optional[str] = None, **kwargs) -> httpx.Response:
+    """POST through the shared async client with the same retry and rate-limit policy as post()"""
+    client = get_async_client()
+    upstream = limiter or 'other'
+    bucket = rate_limiter.get_limiter(limiter)
+    for attempt in range(MAX_RETRIES + 1):
+        if bucket is not None:
+            await bucket.acquire_async()
+        response = None
+        try:
+            with metrics.UPSTREAM_IN_FLIGHT.track_inprogress(upstream=upstream):
+                response = await client.post(url, **kwargs)
+        except httpx.TransportError as e:
+            metrics.record_upstream(upstream, type(e).__name__)
+            if attempt == MAX_RETRIES:
+                raise
+        else:
+            metrics.record_upstream(upstream, response.status_code)
+            if response.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+                if bucket is not None and response.status_code != 429:
+                    bucket.on_success()
+                return response
+        delay = _retry_delay(response, attempt)
+        if bucket is not None and response is not None and response.status_code == 429:
+            bucket.on_throttle(delay)
+        else:
+            await asyncio.sleep(delay)
+
+
+async def close_async_client() -> None:
+    """Close the shared async client (used on shutdown)"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
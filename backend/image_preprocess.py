@@ -0,0 +1,128 @@
+import asyncio
+import concurrent.futures
+import io
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+# Custom Vision 전송 전 이미지 축소/재인코딩 설정 (환경변수로 조정 가능)
+IMAGE_PREPROCESS = os.environ.get("IMAGE_PREPROCESS", "1") != "0"      # "0" 이면 원본 그대로 전송
+IMAGE_MAX_SIDE = int(os.environ.get("IMAGE_MAX_SIDE", "512"))           # 긴 변 최대 픽셀
+IMAGE_JPEG_QUALITY = int(os.environ.get("IMAGE_JPEG_QUALITY", "85"))
+IMAGE_PREPROCESS_WORKERS = int(os.environ.get("IMAGE_PREPROCESS_WORKERS", str(os.cpu_count() or 2)))
+
+EXIF_ORIENTATION = 0x0112
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    'images': 0,
+    'skipped': 0,
+    'failed': 0,
+    'bytes_in': 0,
+    'bytes_out': 0,
+    'seconds': 0.0,          # 호출 측에서 본 전체 시간 (대기 + 프로세스 간 전송 포함)
+    'worker_seconds': 0.0,   # 워커 프로세스 안에서의 디코딩/축소/인코딩 시간
+}
+
+
+def downscale_image(image_bytes: bytes, max_side: int = IMAGE_MAX_SIDE,
+                    quality: int = IMAGE_JPEG_QUALITY) -> Tuple[Optional[bytes], float]:
+    """Apply EXIF orientation, shrink to max_side and re-encode as JPEG.
+
+    Runs inside the process pool. Returns the new bytes and the seconds spent;
+    the bytes are None when the image is already a small, upright JPEG so the
+    original does not have to be shipped back from the worker.
+    """
+    started = time.perf_counter()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+        if max(img.size) <= max_side and orientation == 1 and img.format == 'JPEG':
+            return None, time.perf_counter() - started
+
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        out = io.BytesIO()
+        img.save(out, format='JPEG', quality=quality, optimize=True)
+    return out.getvalue(), time.perf_counter() - started
+
+
+def get_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the shared process pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = concurrent.futures.ProcessPoolExecutor(max_workers=IMAGE_PREPROCESS_WORKERS)
+    return _pool
+
+
+def _record(raw: bytes, processed: Optional[bytes], seconds: float,
+            worker_seconds: float = 0.0, failed: bool = False) -> bytes:
+    """Update the stats and return the bytes to send"""
+    with _stats_lock:
+        _stats['images'] += 1
+        _stats['bytes_in'] += len(raw)
+        _stats['seconds'] += seconds
+        _stats['worker_seconds'] += worker_seconds
+        if failed:
+            _stats['failed'] += 1
+        elif processed is None:
+            _stats['skipped'] += 1
+        result = raw if processed is None else processed
+        _stats['bytes_out'] += len(result)
+    return result
+
+
+def preprocess_image(image_bytes: bytes) -> bytes:
+    """Downscale image bytes in the process pool; falls back to the raw bytes on error"""
+    if not IMAGE_PREPROCESS:
+        return image_bytes
+    started = time.perf_counter()
+    try:
+        processed, worker_seconds = get_pool().submit(downscale_image, image_bytes).result()
+    except Exception:
+        return _record(image_bytes, None, time.perf_counter() - started, failed=True)
+    return _record(image_bytes, processed, time.perf_counter() - started, worker_seconds)
+
+
+async def preprocess_image_async(image_bytes: bytes) -> bytes:
+    """Async variant of preprocess_image; the event loop only awaits the pool"""
+    if not IMAGE_PREPROCESS:
+        return image_bytes
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        processed, worker_seconds = await loop.run_in_executor(get_pool(), downscale_image, image_bytes)
+    except Exception:
+        return _record(image_bytes, None, time.perf_counter() - started, failed=True)
+    return _record(image_bytes, processed, time.perf_counter() - started, worker_seconds)
+
+
+def get_preprocess_stats() -> Dict:
+    """Bytes saved and time spent by the preprocessing stage so far"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['bytes_saved'] = stats['bytes_in'] - stats['bytes_out']
+    stats['avg_ms'] = round(stats['seconds'] / stats['images'] * 1000, 2) if stats['images'] else 0.0
+    stats['ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 4) if stats['bytes_in'] else 1.0
+    stats['max_side'] = IMAGE_MAX_SIDE
+    stats['jpeg_quality'] = IMAGE_JPEG_QUALITY
+    return stats
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes (used on shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
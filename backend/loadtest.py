@@ -0,0 +1,179 @@
+# 업로드 부하 테스트 - Gradio 업로드 API 를 목표 동시성으로 호출하고 처리량 / 지연 시간 백분위를 기록
+# 결과는 JSON Lines 파일에 버전(git 커밋)과 함께 누적해서, 같은 설정의 이전 실행과 비교해 회귀를 확인
+# 사용법: python loadtest.py <이미지 폴더> [--url http://127.0.0.1:8000] [--lang english]
+#                           [--concurrency 8] [--requests 200] [--unique] [--label 메모]
+# 오프라인 측정은 fake_upstreams.py 를 띄우고 KAMIS_API_URL / CUSTOM_VISION_ENDPOINT 를 그쪽으로 지정한 뒤 실행
+import argparse
+import concurrent.futures
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from gradio_client import Client, handle_file
+from gradio_client.exceptions import AppError
+
+import admission
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+RESULTS_FILE = os.environ.get("LOADTEST_RESULTS", "loadtest_results.jsonl")
+API_NAMES = {'single': '/upload_to_do_async', 'batch': '/upload_batch_to_do'}
+
+
+def list_images(folder: str) -> List[str]:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(VALID_EXTENSIONS))
+
+
+def unique_copies(paths: List[str], count: int, workdir: str) -> List[str]:
+    """Copies with a distinct trailing nonce so the prediction cache never answers"""
+    copies = []
+    for i in range(count):
+        source = paths[i % len(paths)]
+        target = os.path.join(workdir, f"{i:06d}_{os.path.basename(source)}")
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            dst.write(src.read())
+            dst.write(os.urandom(16))  # JPEG/PNG 디코더는 끝에 붙은 바이트를 무시함
+        copies.append(target)
+    return copies
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def git_version() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_load(url: str, paths: List[str], concurrency: int, mode: str, batch_size: int) -> Dict:
+    """Fire every upload through `concurrency` clients; each client is one Gradio session"""
+    local = threading.local()
+    api_name = API_NAMES[mode]
+
+    def client() -> Client:
+        if getattr(local, 'client', None) is None:
+            local.client = Client(url, verbose=False)
+        return local.client
+
+    def upload(job: List[str]) -> Dict:
+        started = time.perf_counter()
+        try:
+            if mode == 'batch':
+                client().predict([handle_file(path) for path in job], api_name=api_name)
+            else:
+                client().predict(handle_file(job[0]), api_name=api_name)
+            outcome = 'ok'
+        except AppError as e:
+            # 대기열이 가득 차서 거절한 경우만 busy, 그 밖의 서버 오류는 error
+            outcome = 'busy' if admission.is_busy_message(str(e)) else 'error'
+        except Exception:
+            outcome = 'error'
+        return {'outcome': outcome, 'latency': time.perf_counter() - started}
+
+    step = batch_size if mode == 'batch' else 1
+    jobs = [paths[i:i + step] for i in range(0, len(paths), step)]
+
+    # 세션 연결(설정 조회) 시간은 측정에서 제외
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: client(), range(concurrency)))
+        started = time.perf_counter()
+        samples = list(executor.map(upload, jobs))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(sample['latency'] for sample in samples if sample['outcome'] == 'ok')
+    outcomes = {name: sum(1 for sample in samples if sample['outcome'] == name) for name in ('ok', 'busy', 'error')}
+    return {
+        'requests': len(samples),
+        'images': len(paths),
+        **outcomes,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(outcomes['ok'] / elapsed, 3) if elapsed else 0.0,
+        'images_per_sec': round(outcomes['ok'] * step / elapsed, 3) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def previous_result(results_file: str, record: Dict) -> Optional[Dict]:
+    """Latest stored run with the same scenario"""
+    if not os.path.exists(results_file):
+        return None
+    scenario = ('lang', 'mode', 'concurrency', 'batch_size', 'unique')
+    previous = None
+    with open(results_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                stored = json.loads(line)
+            except ValueError:
+                continue
+            if all(stored.get(key) == record[key] for key in scenario):
+                previous = stored
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Gradio upload API")
+    parser.add_argument("folder")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--lang", default="english", choices=["korean", "japanese", "english"])
+    parser.add_argument("--mode", default="single", choices=sorted(API_NAMES))
+    parser.add_argument("--batch-size", type=int, default=8, help="images per batch upload")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="images to upload")
+    parser.add_argument("--unique", action="store_true", help="make every upload miss the prediction cache")
+    parser.add_argument("--label", default="", help="free-form note stored with the result")
+    parser.add_argument("--results", default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    images = list_images(args.folder)
+    if not images:
+        raise SystemExit(f"No images in {args.folder}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.unique:
+            paths = unique_copies(images, args.requests, workdir)
+        else:
+            paths = [images[i % len(images)] for i in range(args.requests)]
+        result = run_load(f"{args.url.rstrip('/')}/{args.lang}/", paths, args.concurrency, args.mode,
+                          args.batch_size)
+
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': git_version(),
+        'label': args.label,
+        'url': args.url,
+        'lang': args.lang,
+        'mode': args.mode,
+        'batch_size': args.batch_size if args.mode == 'batch' else None,
+        'concurrency': args.concurrency,
+        'unique': args.unique,
+        **result,
+    }
+    previous = previous_result(args.results, record)
+    with open(args.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    print(f"{record['version']}  {args.lang}/{args.mode}  concurrency={args.concurrency}  "
+          f"ok={result['ok']} busy={result['busy']} error={result['error']}")
+    print(f"  throughput {result['throughput_rps']:.2f} req/s   "
+          f"p50 {result['p50_ms']:.0f} ms   p95 {result['p95_ms']:.0f} ms   p99 {result['p99_ms']:.0f} ms")
+    if previous is not None:
+        print(f"  vs {previous['version']} ({previous['timestamp']}): "
+              f"throughput {result['throughput_rps'] - previous['throughput_rps']:+.2f} req/s   "
+              f"p95 {result['p95_ms'] - previous['p95_ms']:+.0f} ms   p99 {result['p99_ms'] - previous['p99_ms']:+.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import io
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Custom Vision 에서 export 한 compact 모델(ONNX / TFLite)로 CPU 에서 직접 분류
+# PREDICTION_BACKEND=local 일 때만 사용하며, 실패하면 원격 엔드포인트로 되돌아감
+PREDICTION_BACKEND = os.environ.get("PREDICTION_BACKEND", "remote")       # "remote" | "local"
+LOCAL_MODEL_PATH = os.environ.get("LOCAL_MODEL_PATH", "model/model.onnx")
+LOCAL_LABELS_PATH = os.environ.get("LOCAL_LABELS_PATH", "model/labels.txt")
+LOCAL_BATCH_SIZE = int(os.environ.get("LOCAL_BATCH_SIZE", "16"))
+LOCAL_THREADS = int(os.environ.get("LOCAL_THREADS", "0"))                 # 0 이면 런타임 기본값
+
+LOCAL_BACKEND = PREDICTION_BACKEND == "local"
+
+_model = None
+_model_error = None
+_model_lock = threading.Lock()
+
+
+def _load_onnx(path: str) -> Tuple[Callable, Tuple[int, int], str]:
+    """Load an ONNX export; returns (run, (height, width), layout)"""
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if LOCAL_THREADS:
+        options.intra_op_num_threads = LOCAL_THREADS
+    session = onnxruntime.InferenceSession(path, sess_options=options,
+                                           providers=['CPUExecutionProvider'])
+    model_input = session.get_inputs()[0]
+    batch_dim, _, height, width = model_input.shape  # NCHW
+    labels = get_labels()
+
+    def run(batch: np.ndarray) -> np.ndarray:
+        if batch_dim == 1:
+            # 배치 차원이 1로 고정된 export 는 한 장씩 실행
+            return np.concatenate([run_one(batch[i:i + 1]) for i in range(batch.shape[0])])
+        return run_one(batch)
+
+    def run_one(batch: np.ndarray) -> np.ndarray:
+        outputs = session.run(None, {model_input.name: batch})
+        return _probabilities(outputs, batch.shape[0], labels)
+
+    return run, (int(height), int(width)), 'NCHW'
+
+
+def _load_tflite(path: str) -> Tuple[Callable, Tuple[int, int], str]:
+    """Load a TensorFlow Lite export; returns (run, (height, width), layout)"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
+
+    interpreter = Interpreter(model_path=path, num_threads=LOCAL_THREADS or None)
+    input_detail = interpreter.get_input_details()[0]
+    output_detail = interpreter.get_output_details()[0]
+    _, height, width, _ = input_detail['shape']  # NHWC
+    lock = threading.Lock()  # Interpreter 는 스레드 안전하지 않음
+
+    def run(batch: np.ndarray) -> np.ndarray:
+        with lock:
+            interpreter.resize_tensor_input(input_detail['index'], batch.shape)
+            interpreter.allocate_tensors()
+            interpreter.set_tensor(input_detail['index'], batch)
+            interpreter.invoke()
+            return np.array(interpreter.get_tensor(output_detail['index']))
+
+    return run, (int(height), int(width)), 'NHWC'
+
+
+MODEL_LOADERS: Dict[str, Callable] = {
+    '.onnx': _load_onnx,
+    '.tflite': _load_tflite,
+}
+
+
+def _probabilities(outputs: Sequence, batch_size: int, labels: List[str]) -> np.ndarray:
+    """Pick the (batch, labels) probability array out of the model outputs"""
+    for output in outputs:
+        # 구버전 export 는 (batch, 1) classLabel 문자열 배열이 먼저 나오므로 실수형 (batch, labels) 배열만 사용
+        if (isinstance(output, np.ndarray) and output.shape == (batch_size, len(labels))
+                and np.issubdtype(output.dtype, np.floating)):
+            return output
+    # 구버전 export: [{label: prob, ...}, ...] 형태
+    for output in outputs:
+        if isinstance(output, list) and output and isinstance(output[0], dict):
+            return np.array([[row.get(label, 0.0) for label in labels] for row in output])
+    raise ValueError("model has no (batch, labels) probability output")
+
+
+def get_labels() -> List[str]:
+    """Tag names in model output order (labels.txt from the export)"""
+    with open(LOCAL_LABELS_PATH, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def get_model():
+    """Load the exported model once; returns None if it cannot be loaded"""
+    global _model, _model_error
+    if _model is None and _model_error is None:
+        with _model_lock:
+            if _model is None and _model_error is None:
+                try:
+                    loader = MODEL_LOADERS[os.path.splitext(LOCAL_MODEL_PATH)[1].lower()]
+                    run, size, layout = loader(LOCAL_MODEL_PATH)
+                    _model = (run, size, layout, get_labels())
+                except Exception as e:
+                    _model_error = e
+                    print(f"Local model unavailable, using remote endpoint: {e}")
+    return _model
+
+
+def _to_array(image_bytes: bytes, size: Tuple[int, int], layout: str) -> np.ndarray:
+    """Decode, orient and resize one image to the model's BGR float input"""
+    height, width = size
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.draft('RGB', (width * 2, height * 2))  # JPEG 은 축소 디코딩
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        img = img.resize((width, height), Image.BILINEAR)
+        array = np.asarray(img, dtype=np.float32)[:, :, ::-1]  # RGB -> BGR (Custom Vision 학습 형식)
+    if layout == 'NCHW':
+        array = array.transpose(2, 0, 1)
+    return np.ascontiguousarray(array)
+
+
+def predict_images_local(images: List[bytes]) -> List[str]:
+    """Classify images in batches of LOCAL_BATCH_SIZE; returns name_status tags"""
+    model = get_model()
+    if model is None:
+        raise RuntimeError(f"local model not loaded: {_model_error}")
+    run, size, layout, labels = model
+
+    tags = []
+    for start in range(0, len(images), LOCAL_BATCH_SIZE):
+        chunk = images[start:start + LOCAL_BATCH_SIZE]
+        batch = np.stack([_to_array(image, size, layout) for image in chunk])
+        probabilities = run(batch)
+        tags.extend(labels[i] for i in probabilities.argmax(axis=1))
+    return tags
+
+
+def try_predict_local(image_bytes: bytes) -> Optional[str]:
+    """Local prediction for one image, or None so the caller falls back to remote"""
+    if not LOCAL_BACKEND:
+        return None
+    try:
+        return predict_images_local([image_bytes])[0]
+    except Exception as e:
+        print(f"Local inference failed, falling back to remote: {e}")
+        return None
+
+
+def try_predict_local_files(paths: List[str]) -> Optional[List[str]]:
+    """Batched local prediction for uploaded files, or None to fall back to remote"""
+    if not LOCAL_BACKEND:
+        return None
+    try:
+        tags = []
+        for start in range(0, len(paths), LOCAL_BATCH_SIZE):
+            chunk = []
+            for path in paths[start:start + LOCAL_BATCH_SIZE]:
+                with open(path, "rb") as img_file:
+                    chunk.append(img_file.read())
+            tags.extend(predict_images_local(chunk))
+        return tags
+    except Exception as e:
+        print(f"Local batch inference failed, falling back to remote: {e}")
+        return None
@@ -1,13 +1,36 @@
 # backend/main.py
+import os
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import uvicorn
 import gradio as gr
 
+import admission
+import api
+import events
+import http_client
+import image_preprocess
+import metrics
+import prediction_cache
+import rate_limiter
+import price_store
+import session_store
+import shared_cache
+import fruit_engine
+from fruit_engine import get_api_configs, get_date_range, get_fruit_price
+
 # 각각의 Gradio 페이지에서 만든 "demo_kr", "demo_jp", "demo_en" import
 from gradio_korean import demo_kr
 from gradio_japanese import demo_jp
 from gradio_english import demo_en
 
+# 워커 프로세스 수 - 1보다 크면 uvicorn 이 프로세스를 여러 개 띄우고 캐시는 shared_cache 로 공유
+# Gradio 큐(/queue/join -> /queue/data)는 프로세스별 상태라 UI 는 세션 고정(sticky) 프록시 뒤에서 사용
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", "1"))
+WEB_HOST = os.environ.get("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.environ.get("WEB_PORT", "8000"))
+
 app = FastAPI()
 
 # Gradio 앱들을 각기 다른 path로 mount
@@ -15,9 +38,153 @@ app = gr.mount_gradio_app(app, demo_kr, path="/korean")
 app = gr.mount_gradio_app(app, demo_jp, path="/japanese")
 app = gr.mount_gradio_app(app, demo_en, path="/english")
 
+# 자동화 클라이언트용 JSON API (/api/classify, /api/classify/batch, /api/prices/..., /api/sessions/...)
+app.include_router(api.router)
+
+# /metrics 의 http_requests_in_flight 라벨로 쓰는 첫 경로
+METRIC_APPS = ('korean', 'japanese', 'english', 'api', 'stats', 'metrics')
+
+class TrackInFlight:
+    """Pure ASGI middleware: a request counts as in flight until its whole body is sent.
+
+    BaseHTTPMiddleware would stop counting as soon as the handler returns, so
+    streams (SSE, the Gradio queue) would never show up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        app_name = scope['path'].strip('/').split('/', 1)[0] or 'root'
+        if app_name not in METRIC_APPS:
+            app_name = 'other'
+        with metrics.HTTP_IN_FLIGHT.track_inprogress(app=app_name):
+            await self.app(scope, receive, send)
+
+app.add_middleware(TrackInFlight)
+
+def cache_metrics():
+    # 캐시 적중/미스는 각 모듈의 통계를 스크랩 시점에 읽어서 보고
+    price = fruit_engine.price_cache.stats()
+    store = price_store.get_store_stats()
+    prediction = prediction_cache.get_cache_stats()
+    shared = shared_cache.get_stats()
+    yield ('cache_hits_total', 'counter', 'Cache hits by cache tier', [
+        ({'cache': 'price_snapshot'}, store['hits']),
+        ({'cache': 'price_memory'}, price['hits']),
+        ({'cache': 'prediction_memory'}, prediction['memory_hits']),
+        ({'cache': 'prediction_shared'}, prediction['shared_hits']),
+        ({'cache': 'shared'}, shared['hits']),
+    ])
+    yield ('cache_misses_total', 'counter', 'Cache misses by cache tier', [
+        ({'cache': 'price_snapshot'}, store['misses']),
+        ({'cache': 'price_memory'}, price['misses']),
+        ({'cache': 'prediction'}, prediction['misses']),
+        ({'cache': 'shared'}, shared['misses']),
+    ])
+    yield ('cache_coalesced_total', 'counter', 'Concurrent misses that waited for another caller\'s load', [
+        ({'cache': 'price_memory'}, price['coalesced']),
+        ({'cache': 'shared'}, shared['waits']),
+    ])
+    yield ('cache_entries', 'gauge', 'Entries currently held in memory', [
+        ({'cache': 'price_memory'}, price['size']),
+        ({'cache': 'prediction_memory'}, prediction['memory_size']),
+    ])
+
+def admission_metrics():
+    endpoints = admission.get_admission_stats()
+    yield ('admission_running', 'gauge', 'Upload handlers holding a processing slot',
+           [({'endpoint': name}, stats['running']) for name, stats in endpoints.items()])
+    yield ('admission_waiting', 'gauge', 'Upload handlers waiting for a processing slot',
+           [({'endpoint': name}, stats['waiting']) for name, stats in endpoints.items()])
+    yield ('admission_rejected_total', 'counter', 'Uploads rejected because the queue was full',
+           [({'endpoint': name}, stats['rejected']) for name, stats in endpoints.items()])
+    limiters = rate_limiter.get_limiter_stats()
+    yield ('rate_limit_rate', 'gauge', 'Current allowed upstream calls per second',
+           [({'upstream': name}, stats['rate']) for name, stats in limiters.items()])
+    yield ('rate_limit_throttled_total', 'counter', 'Upstream 429 responses fed back to the rate limiter',
+           [({'upstream': name}, stats['throttled']) for name, stats in limiters.items()])
+
+metrics.register_collector(cache_metrics)
+metrics.register_collector(admission_metrics)
+
+@app.on_event("startup")
+def start_price_prefetcher():
+    # KAMIS 데이터 공개 직후 전 품목 가격을 미리 받아 저장 (사용자 요청은 저장소에서만 조회)
+    price_store.start_prefetcher(get_fruit_price, get_date_range, get_api_configs()['category_dict'])
+
+@app.on_event("shutdown")
+async def close_http_pool():
+    # 공유 커넥션 풀 정리 (동기/비동기)
+    http_client.close_session()
+    await http_client.close_async_client()
+    image_preprocess.shutdown_pool()
+    price_store.stop_prefetcher()
+
 @app.get("/")
 def read_root():
     return {"message": "Hello from Multi-Language Gradio!"}
 
+# 이미지 전처리 효과 (절감 바이트, 소요 시간) 확인용
+@app.get("/stats/preprocess")
+def preprocess_stats():
+    return image_preprocess.get_preprocess_stats()
+
+# 예측 캐시 적중률 확인용
+@app.get("/stats/prediction-cache")
+def prediction_cache_stats():
+    return prediction_cache.get_cache_stats()
+
+# 가격 스냅샷 저장소 상태 확인용
+@app.get("/stats/prices")
+def price_store_stats():
+    return price_store.get_store_stats()
+
+# 세 언어 앱이 공유하는 KAMIS 응답 캐시 (적중/미스/병합 횟수)
+@app.get("/stats/price-cache")
+def price_cache_stats():
+    return fruit_engine.price_cache.stats()
+
+# Prometheus 스크랩용 지표 (지연 시간 히스토그램, 캐시 적중, 외부 API 오류, 처리 중 요청 수)
+@app.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# 업로드 엔드포인트별 대기열 상태 (대기 시간 / 처리 시간 백분위, 거절 횟수)
+@app.get("/stats/admission")
+def admission_stats():
+    return admission.get_admission_stats()
+
+# 세션 이벤트 채널 상태 (채널/구독자 수, 발행/전달 횟수)
+@app.get("/stats/events")
+def event_stats():
+    return events.get_event_stats()
+
+# 외부 API 별 호출 속도 제한 상태 (현재 속도, 대기/거절/429 횟수)
+@app.get("/stats/rate-limits")
+def rate_limit_stats():
+    return rate_limiter.get_limiter_stats()
+
+# 워커 간 공유 캐시 상태 (백엔드 종류, 적중/대기 횟수)
+@app.get("/stats/shared-cache")
+def shared_cache_stats():
+    return shared_cache.get_stats()
+
+# 세션 수와 세션 상태가 차지하는 메모리 확인용
+@app.get("/stats/sessions")
+def session_stats():
+    return session_store.memory_report()
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if WEB_WORKERS > 1:
+        # 워커마다 이미지 전처리 프로세스 풀을 만들므로 코어를 나눠서 사용
+        os.environ.setdefault("IMAGE_PREPROCESS_WORKERS", str(max(1, (os.cpu_count() or 2) // WEB_WORKERS)))
+        # 외부 API 호출 속도 제한도 워커 수로 나눠서 전체 속도가 설정값을 넘지 않게 함
+        os.environ.setdefault("RATE_LIMIT_PROCESSES", str(WEB_WORKERS))
+        # 여러 워커를 띄우려면 앱을 import 문자열로 넘겨야 함
+        uvicorn.run("main:app", host=WEB_HOST, port=WEB_PORT, workers=WEB_WORKERS)
+    else:
+        uvicorn.run(app, host=WEB_HOST, port=WEB_PORT)
@@ -0,0 +1,208 @@
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# /metrics 용 Prometheus 텍스트 형식 지표 (외부 라이브러리 없이 필요한 만큼만 구현)
+# 값은 프로세스별 - WEB_WORKERS 로 여러 워커를 띄우면 스크랩한 워커의 값만 보임
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (이름, 종류, 설명, [(라벨, 값), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}  # 라벨 값 튜플 -> 값
+        _metrics.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _render_values(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._render_values()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """Count the enclosed block as in flight"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the enclosed block, including when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_values(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def timed(histogram: Histogram, **labels) -> Callable:
+    """Decorator observing a sync or async function's duration"""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_metrics: List[_Metric] = []
+_collectors: List[Callable[[], Iterable[Family]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]) -> None:
+    """Add a callback that reports values read at scrape time (e.g. cache stats)"""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in list(_metrics):
+        lines.extend(metric.render())
+    for collector in list(_collectors):
+        try:
+            families = list(collector())
+        except Exception as e:
+            lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {_escape(e)}")
+            continue
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+# 요청 경로별 소요 시간
+PREDICT_IMAGE_SECONDS = Histogram('predict_image_seconds', 'Time to classify one image (local model, cache or Custom Vision)')
+GET_FRUIT_PRICE_SECONDS = Histogram('get_fruit_price_seconds', 'KAMIS price request latency including retries and rate-limit waits')
+CALCULATE_PRICES_SECONDS = Histogram('calculate_prices_seconds', 'Time to build one price table from KAMIS items')
+UPLOAD_SECONDS = Histogram('upload_to_do_seconds', 'End-to-end upload handler time after admission',
+                           ['language', 'mode'])
+
+# 외부 API 응답 / 오류
+UPSTREAM_RESPONSES = Counter('upstream_responses_total', 'Upstream HTTP responses by status, counting every retry attempt', ['upstream', 'status'])
+UPSTREAM_ERRORS = Counter('upstream_errors_total', 'Upstream attempts that got an HTTP error status or a transport error',
+                          ['upstream', 'status'])
+
+# 처리 중인 요청 수
+UPSTREAM_IN_FLIGHT = Gauge('upstream_requests_in_flight', 'Upstream HTTP calls currently in flight', ['upstream'])
+UPLOADS_IN_FLIGHT = Gauge('uploads_in_flight', 'Upload handlers currently processing', ['language', 'mode'])
+HTTP_IN_FLIGHT = Gauge('http_requests_in_flight', 'HTTP requests currently being served', ['app'])
+
+
+def record_upstream(upstream: str, status) -> None:
+    """Count one upstream attempt; status is an HTTP code or an exception name"""
+    UPSTREAM_RESPONSES.inc(upstream=upstream, status=status)
+    if not isinstance(status, int) or status >= 400:
+        UPSTREAM_ERRORS.inc(upstream=upstream, status=status)
+
+
+@contextmanager
+def track_upload(language: str, mode: str):
+    """In-flight gauge plus end-to-end histogram for one upload handler call"""
+    with UPLOADS_IN_FLIGHT.track_inprogress(language=language, mode=mode):
+        with UPLOAD_SECONDS.time(language=language, mode=mode):
+            yield
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import shared_cache
+
+# 같은 이미지를 다시 올렸을 때 Custom Vision 유료 호출을 생략하기 위한 예측 결과 캐시
+# 메모리 LRU -> 공유 캐시(shared_cache, 워커 프로세스끼리 공유) 순으로 조회
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))          # 메모리 항목 수
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", str(7 * 24 * 3600)))  # 초
+
+KEY_PREFIX = 'prediction:'
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # key -> (tag, monotonic 만료 시각)
+_stats = {
+    'hits': 0,
+    'memory_hits': 0,
+    'shared_hits': 0,
+    'misses': 0,
+    'expired': 0,
+    'evictions': 0,
+}
+
+
+def image_key(image_bytes: bytes) -> str:
+    """Content hash used as the cache key"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def _remember(key: str, tag: str, ttl: float = PREDICTION_CACHE_TTL) -> None:
+    # _lock 을 잡은 상태에서만 호출
+    _memory[key] = (tag, time.monotonic() + ttl)
+    _memory.move_to_end(key)
+    while len(_memory) > PREDICTION_CACHE_SIZE:
+        _memory.popitem(last=False)
+        _stats['evictions'] += 1
+
+
+def _get_memory(key: str) -> Optional[str]:
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            tag, expires_at = entry
+            if expires_at > time.monotonic():
+                _memory.move_to_end(key)
+                _stats['hits'] += 1
+                _stats['memory_hits'] += 1
+                return tag
+            del _memory[key]
+            _stats['expired'] += 1
+    return None
+
+
+def _get_shared(key: str) -> Optional[str]:
+    # 다른 워커가 이미 분류한 이미지인지 확인 (잠금 밖에서 조회)
+    entry = shared_cache.get(KEY_PREFIX + key)
+    with _lock:
+        if entry is not None:
+            tag, created_at = entry
+            age = time.time() - created_at
+            if age < PREDICTION_CACHE_TTL:
+                # 남은 TTL 만큼만 메모리에 올림
+                _remember(key, tag, PREDICTION_CACHE_TTL - age)
+                _stats['hits'] += 1
+                _stats['shared_hits'] += 1
+                return tag
+
+        _stats['misses'] += 1
+        return None
+
+
+def get_prediction(key: str) -> Optional[str]:
+    """Return the cached tag for an image hash, or None on a miss"""
+    tag = _get_memory(key)
+    return tag if tag is not None else _get_shared(key)
+
+
+async def get_prediction_async(key: str) -> Optional[str]:
+    """get_prediction for the event loop; the shared tier (SQLite/Redis) is queried in a worker thread"""
+    tag = _get_memory(key)
+    return tag if tag is not None else await asyncio.to_thread(_get_shared, key)
+
+
+def put_prediction(key: str, tag: str) -> None:
+    """Store a successful prediction in both tiers"""
+    with _lock:
+        _remember(key, tag)
+    shared_cache.put(KEY_PREFIX + key, [tag, time.time()], PREDICTION_CACHE_TTL)
+
+
+async def put_prediction_async(key: str, tag: str) -> None:
+    """put_prediction for the event loop; the shared tier is written in a worker thread"""
+    with _lock:
+        _remember(key, tag)
+    await asyncio.to_thread(shared_cache.put, KEY_PREFIX + key, [tag, time.time()], PREDICTION_CACHE_TTL)
+
+
+def get_cache_stats() -> Dict:
+    """Hit/miss counters and current sizes"""
+    with _lock:
+        stats = dict(_stats)
+        stats['memory_size'] = len(_memory)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def clear_cache() -> None:
+    """Drop every cached prediction"""
+    with _lock:
+        _memory.clear()
+    backend = shared_cache.get_backend()
+    if backend is not None:
+        backend.clear(KEY_PREFIX)
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# KAMIS 가격 스냅샷 저장소 + 백그라운드 사전 조회
+# 매일 KAMIS 데이터가 올라온 직후 전 품목을 미리 받아 SQLite 에 저장하고,
+# 사용자 요청은 이 저장소에서만 읽도록 해서 요청 경로에서 KAMIS 를 기다리지 않게 함
+PRICE_STORE_DB = os.environ.get("PRICE_STORE_DB", "price_snapshot.db")
+PRICE_STORE_KEEP_DAYS = int(os.environ.get("PRICE_STORE_KEEP_DAYS", "7"))
+# get_date_range 가 hour > 14, 즉 15시부터 오늘 날짜 범위로 바뀜
+PRICE_CUTOFF_HOUR = int(os.environ.get("PRICE_CUTOFF_HOUR", "15"))
+PRICE_REFRESH_DELAY = int(os.environ.get("PRICE_REFRESH_DELAY", "60"))        # 기준 시각 이후 대기 (초)
+PRICE_RETRY_INTERVAL = int(os.environ.get("PRICE_RETRY_INTERVAL", "300"))     # 실패 시 재시도 간격 (초)
+# 워커 프로세스가 여럿이면 이 파일 잠금을 얻은 프로세스 하나만 사전 조회 (나머지는 대기하다가 이어받음)
+PRICE_PREFETCH_LOCK = os.environ.get("PRICE_PREFETCH_LOCK", "price_prefetch.lock")
+
+_lock = threading.Lock()
+_db = None
+_snapshots = {}  # (product, start, end) -> data, 디스크에서 읽은 스냅샷의 메모리 사본
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'refreshes': 0,
+    'refresh_errors': 0,
+    'last_refresh': None,
+}
+
+_prefetch_thread = None
+_prefetch_lock_file = None
+_stop = threading.Event()
+
+
+def _get_db() -> sqlite3.Connection:
+    # _lock 을 잡은 상태에서만 호출
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(PRICE_STORE_DB, check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS price_snapshots ("
+            " product TEXT NOT NULL, start_date TEXT NOT NULL, end_date TEXT NOT NULL,"
+            " data TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (product, start_date, end_date))"
+        )
+        _db.commit()
+    return _db
+
+
+def is_valid(data: Dict) -> bool:
+    """KAMIS answers errors with a 200 and no item list"""
+    try:
+        return len(data['data']['item']) > 0
+    except (KeyError, TypeError):
+        return False
+
+
+def get_snapshot(product: str, start_date: str, end_date: str) -> Optional[Dict]:
+    """Stored KAMIS response for a product and date range, or None"""
+    key = (product, start_date, end_date)
+    with _lock:
+        data = _snapshots.get(key)
+        if data is None:
+            row = _get_db().execute(
+                "SELECT data FROM price_snapshots WHERE product = ? AND start_date = ? AND end_date = ?",
+                key
+            ).fetchone()
+            if row is not None:
+                data = json.loads(row[0])
+                _snapshots[key] = data
+        if data is None:
+            _stats['misses'] += 1
+        else:
+            _stats['hits'] += 1
+        return data
+
+
+def save_snapshot(product: str, start_date: str, end_date: str, data: Dict) -> None:
+    """Persist one KAMIS response"""
+    if not is_valid(data):
+        return
+    key = (product, start_date, end_date)
+    with _lock:
+        db = _get_db()
+        db.execute("INSERT OR REPLACE INTO price_snapshots VALUES (?, ?, ?, ?, ?)",
+                   key + (json.dumps(data, ensure_ascii=False), time.time()))
+        db.commit()
+        _snapshots[key] = data
+
+
+def prune(keep_days: int = PRICE_STORE_KEEP_DAYS) -> None:
+    """Drop snapshots whose range ended more than keep_days ago"""
+    oldest = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    with _lock:
+        db = _get_db()
+        db.execute("DELETE FROM price_snapshots WHERE end_date < ?", (oldest,))
+        db.commit()
+        for key in [k for k in _snapshots if k[2] < oldest]:
+            del _snapshots[key]
+
+
+def refresh_all(fetch: Callable[[str, str, str], Dict], date_range: Tuple[str, str],
+                products: Iterable[str]) -> List[str]:
+    """Fetch every product missing from the store for the date range; returns failed products"""
+    end_date, start_date = date_range  # get_date_range() 는 (최근, 이전) 순서
+    failed = []
+    for product in products:
+        if get_snapshot(product, start_date, end_date) is not None:
+            continue
+        try:
+            data = fetch(product, start_date, end_date)
+            if not is_valid(data):
+                raise ValueError(f"empty KAMIS response for {product}")
+            save_snapshot(product, start_date, end_date, data)
+        except Exception as e:
+            print(f"Price prefetch failed for {product}: {e}")
+            failed.append(product)
+
+    with _lock:
+        _stats['refreshes'] += 1
+        _stats['refresh_errors'] += len(failed)
+        _stats['last_refresh'] = datetime.now().isoformat(timespec='seconds')
+    return failed
+
+
+def next_refresh_delay(now: datetime) -> float:
+    """Seconds until just after the next daily KAMIS publication cutoff"""
+    target = now.replace(hour=PRICE_CUTOFF_HOUR, minute=0, second=0, microsecond=0)
+    target += timedelta(seconds=PRICE_REFRESH_DELAY)
+    if now >= target:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def _acquire_prefetch_lock() -> bool:
+    """True once this process owns the prefetch lock file; held until the process exits"""
+    global _prefetch_lock_file
+    if _prefetch_lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:  # Windows - 단일 프로세스 실행으로 간주
+        return True
+    lock_file = open(PRICE_PREFETCH_LOCK, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _prefetch_lock_file = lock_file
+    return True
+
+
+def _prefetch_loop(fetch: Callable, date_range_fn: Callable, products: List[str]) -> None:
+    while not _stop.is_set():
+        if not _acquire_prefetch_lock():
+            # 다른 워커가 사전 조회 중 - 그 프로세스가 종료되면 잠금을 이어받음
+            _stop.wait(PRICE_RETRY_INTERVAL)
+            continue
+        failed = refresh_all(fetch, date_range_fn(), products)
+        prune()
+        delay = PRICE_RETRY_INTERVAL if failed else next_refresh_delay(datetime.now())
+        _stop.wait(delay)
+
+
+def start_prefetcher(fetch: Callable[[str, str, str], Dict], date_range_fn: Callable[[], Tuple[str, str]],
+                     products: Iterable[str]) -> None:
+    """Start the daily refresh thread; only the process holding PRICE_PREFETCH_LOCK calls KAMIS"""
+    global _prefetch_thread
+    with _lock:
+        if _prefetch_thread is not None and _prefetch_thread.is_alive():
+            return
+        _stop.clear()
+        _prefetch_thread = threading.Thread(target=_prefetch_loop, args=(fetch, date_range_fn, list(products)),
+                                            name="price-prefetcher", daemon=True)
+        _prefetch_thread.start()
+
+
+def stop_prefetcher() -> None:
+    """Ask the refresh thread to exit"""
+    _stop.set()
+
+
+def get_store_stats() -> Dict:
+    """Hit/miss counters and refresh status"""
+    with _lock:
+        stats = dict(_stats)
+        stats['snapshots'] = _get_db().execute("SELECT COUNT(*) FROM price_snapshots").fetchone()[0]
+    stats['prefetch_owner'] = _prefetch_lock_file is not None
+    stats['pid'] = os.getpid()
+    return stats
@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# KAMIS 응답 -> 가격 테이블 변환 (언어별 calculate_prices 가 공통으로 사용)
+# 행마다 df.loc[i] 로 채우던 방식 대신, 열 단위 배열을 만든 뒤 DataFrame 을 한 번에 생성
+# (행이 수십 개 수준이라 문자열 열은 Series.map 보다 리스트가 빠름, 가격 계산만 numpy 로 처리)
+LOW_QUALITY_DISCOUNT = 0.6  # 'low' 상태 가격 할인율
+ROWS_PER_PRODUCT = 5
+
+# (KAMIS item 목록, 상태 코드, 품목 코드)
+PriceEntry = Tuple[Sequence[Dict], str, str]
+
+
+def build_price_table(entries: Sequence[PriceEntry], columns: List[str], units: Dict[str, str],
+                      product_names: Optional[Dict[str, str]] = None,
+                      region_names: Optional[Dict[str, str]] = None,
+                      status_names: Optional[Dict[str, str]] = None,
+                      upper_status: bool = False) -> pd.DataFrame:
+    """Build one price table for any number of (items, status, product) entries.
+
+    columns are the localized headers for product, condition, region, price and
+    unit. Names missing from the translation maps fall back to the KAMIS value.
+    """
+    items = []
+    statuses = []
+    fruits_names = []
+    for price_data, fruits_status, fruits_name in entries:
+        rows = price_data[:ROWS_PER_PRODUCT]
+        items.extend(rows)
+        statuses.extend([fruits_status] * len(rows))
+        fruits_names.extend([fruits_name] * len(rows))
+
+    prices = np.char.replace(np.array([item['price'] for item in items], dtype=str), ',', '').astype(float)
+    prices = np.where(np.array(statuses, dtype=object) == 'low', prices * LOW_QUALITY_DISCOUNT, prices)
+
+    product = [item['itemname'] for item in items]
+    region = [item['countyname'] for item in items]
+    if product_names:
+        product = [product_names.get(name, name) for name in product]
+    if region_names:
+        region = [region_names.get(name, name) for name in region]
+
+    condition = statuses
+    if status_names:
+        condition = [status_names.get(status, status) for status in condition]
+    if upper_status:
+        condition = [status.upper() for status in condition]
+
+    product_col, condition_col, region_col, price_col, unit_col = columns
+    return pd.DataFrame({
+        product_col: product,
+        condition_col: condition,
+        region_col: region,
+        price_col: [f"{price:,.0f}" for price in prices.tolist()],
+        unit_col: [units[name] for name in fruits_names],
+    }, columns=columns)
+
+
+def build_price_records(price_data: Sequence[Dict], fruits_status: str, unit: str) -> List[Dict]:
+    """Numeric price rows (region, price, unit) for JSON clients; same rows and discount as the table"""
+    rows = price_data[:ROWS_PER_PRODUCT]
+    discount = LOW_QUALITY_DISCOUNT if fruits_status == 'low' else 1.0
+    return [
+        {
+            'region': item['countyname'],
+            'price': round(float(str(item['price']).replace(',', '')) * discount),
+            'unit': unit,
+        }
+        for item in rows
+    ]
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# 외부 API 별 호출 속도 제한 (토큰 버킷)
+# 업로드가 몰려도 Custom Vision (초당 트랜잭션 제한) / KAMIS 로 나가는 호출은 설정한 속도로 줄 세우고,
+# 429 + Retry-After 를 받으면 그 시간만큼 멈춘 뒤 속도를 낮췄다가 성공이 이어지면 원래 속도로 복구
+# 속도는 프로세스 기준 - WEB_WORKERS 로 여러 프로세스를 띄우면 RATE_LIMIT_PROCESSES 로 나눠서 사용
+RATE_LIMIT_PROCESSES = max(1, int(os.environ.get("RATE_LIMIT_PROCESSES", "1")))
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("RATE_LIMIT_MAX_WAIT", "30"))  # 이보다 오래 기다려야 하면 포기 (초)
+THROTTLE_FACTOR = 0.5    # 429 를 받으면 속도를 절반으로
+RECOVERY_STEP = 0.05     # 성공할 때마다 설정 속도의 5% 씩 복구
+MIN_RATE_FACTOR = 0.1    # 설정 속도의 10% 아래로는 내리지 않음
+
+
+class RateLimitExceeded(Exception):
+    """The queue ahead of this call is longer than RATE_LIMIT_MAX_WAIT"""
+
+
+class TokenBucket:
+    """Thread- and asyncio-safe token bucket that backs off on Retry-After.
+
+    Callers reserve a token and sleep until it is due, so a burst is queued in
+    arrival order instead of being rejected.
+    """
+
+    def __init__(self, rate: float, burst: float, name: str = '', max_wait: float = RATE_LIMIT_MAX_WAIT):
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = rate * MIN_RATE_FACTOR
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.monotonic()  # 이 시각 이후부터 토큰이 다시 찬다 (Retry-After 동안은 미래 시각)
+        self._stats = {
+            'calls': 0,
+            'delayed': 0,
+            'rejected': 0,
+            'throttled': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def _refill(self, now: float) -> None:
+        # self._lock 을 잡은 상태에서만 호출
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._updated - now) + max(0.0, 1 - self._tokens) / self.rate
+            if wait > self.max_wait:
+                self._stats['rejected'] += 1
+                raise RateLimitExceeded(f"{self.name} rate limit queue is {wait:.1f}s long")
+            self._tokens -= 1
+            self._stats['calls'] += 1
+            if wait > 0:
+                self._stats['delayed'] += 1
+                self._stats['wait_seconds'] += wait
+            return wait
+
+    def acquire(self) -> float:
+        """Block until a call is allowed; returns the seconds waited"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Async variant of acquire"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_throttle(self, retry_after: float) -> None:
+        """Upstream said 429: pause everyone for retry_after and slow down"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            resume = now + retry_after
+            if resume > self._updated:
+                self._tokens = min(self._tokens, 0.0)
+                self._updated = resume
+            self.rate = max(self.min_rate, self.rate * THROTTLE_FACTOR)
+            self._stats['throttled'] += 1
+
+    def on_success(self) -> None:
+        """Creep back towards the configured rate"""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['rate'] = round(self.rate, 3)
+            stats['tokens'] = round(self._tokens, 3)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        stats['max_rate'] = self.max_rate
+        stats['burst'] = self.burst
+        return stats
+
+
+def _bucket(name: str, env_prefix: str, rate: str, burst: str) -> TokenBucket:
+    per_process = float(os.environ.get(f"{env_prefix}_RATE", rate)) / RATE_LIMIT_PROCESSES
+    return TokenBucket(per_process, max(1.0, float(os.environ.get(f"{env_prefix}_BURST", burst))), name=name)
+
+
+# 업스트림 이름 -> 버킷 (초당 호출 수 / 순간 허용량은 배포 환경별로 환경변수로 조정)
+# Custom Vision 예측 S0 등급은 초당 10건, KAMIS 는 공개 제한이 없어 보수적으로 설정
+LIMITERS = {
+    'custom_vision': _bucket('custom_vision', 'CUSTOM_VISION', '10', '10'),
+    'kamis': _bucket('kamis', 'KAMIS', '5', '5'),
+}
+
+
+def get_limiter(name: Optional[str]) -> Optional[TokenBucket]:
+    return LIMITERS.get(name) if name else None
+
+
+def get_limiter_stats() -> Dict:
+    """Per-upstream counters and current rates"""
+    return {name: bucket.stats() for name, bucket in LIMITERS.items()}
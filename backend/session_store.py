@@ -0,0 +1,149 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# 방문자(Gradio 세션)별 상태 저장소
+# 예전에는 fruit_count / price_dict / image_read 가 모듈 전역이라 모든 방문자가 공유했고
+# 서버가 살아있는 동안 계속 커졌음 -> 세션별로 분리하고 개수/유휴 시간으로 정리
+SESSION_MAX = int(os.environ.get("SESSION_MAX", "1000"))                   # 동시에 유지할 세션 수
+SESSION_IDLE_TIMEOUT = float(os.environ.get("SESSION_IDLE_TIMEOUT", "1800"))  # 초
+SESSION_MAX_IMAGES = int(os.environ.get("SESSION_MAX_IMAGES", "200"))     # 갤러리에 남길 최근 이미지 수
+SWEEP_INTERVAL = 60  # 유휴 세션 정리 주기 (초)
+
+
+class SessionState:
+    """Counts, priced products and recent uploads for one visitor"""
+
+    __slots__ = ('session_id', 'lock', 'fruit_count', 'price_dict', 'image_read', 'last_seen',
+                 'price_range', 'price_tables', 'combined_price_df')
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        # 배치 업로드(작업 스레드)와 단일 업로드(이벤트 루프)가 같은 세션을 동시에 바꿀 수 있음
+        self.lock = threading.Lock()
+        self.fruit_count = {}                               # 'apple_fr' -> 개수
+        self.price_dict = {}                                # 가격 조회 대상 'apple_fr' -> True
+        self.image_read = deque(maxlen=SESSION_MAX_IMAGES)  # 최근 업로드 파일 경로
+        self.last_seen = time.monotonic()
+        # 가격 테이블은 새로 등장한 품목만 조회해서 덧붙이고, 날짜 범위(스냅샷)가 바뀌면 다시 만듦
+        self.price_range = None                             # (start_date, end_date)
+        self.price_tables = {}                              # 'apple_fr' -> 품목별 가격 DataFrame
+        self.combined_price_df = None
+
+    def pending_price_keys(self, start_date: str, end_date: str) -> List[str]:
+        """Priced products that have no table yet for this date range"""
+        with self.lock:
+            if self.price_range != (start_date, end_date):
+                self.price_range = (start_date, end_date)
+                self.price_tables = {}
+                self.combined_price_df = None
+            return [key for key in self.price_dict if key not in self.price_tables]
+
+    def add_price_tables(self, tables: Dict[str, pd.DataFrame], start_date: str,
+                         end_date: str) -> Tuple[List[pd.DataFrame], pd.DataFrame]:
+        """Append newly priced products to the combined table and return all tables.
+
+        Tables fetched for a date range that has since been replaced are dropped.
+        """
+        with self.lock:
+            if self.price_range != (start_date, end_date):
+                tables = {}
+            new_tables = [df for key, df in tables.items() if key not in self.price_tables]
+            for key, df in tables.items():
+                self.price_tables.setdefault(key, df)
+
+            if self.combined_price_df is None or self.combined_price_df.empty:
+                all_dfs = list(self.price_tables.values())
+                self.combined_price_df = pd.concat(all_dfs, ignore_index=True) if all_dfs else pd.DataFrame()
+            elif new_tables:
+                self.combined_price_df = pd.concat([self.combined_price_df] + new_tables, ignore_index=True)
+            return list(self.price_tables.values()), self.combined_price_df
+
+    def counts(self) -> Dict[str, int]:
+        """Snapshot of the per-tag counts"""
+        with self.lock:
+            return dict(self.fruit_count)
+
+_lock = threading.Lock()
+_sessions = OrderedDict()  # session_id -> SessionState, 오래 안 쓴 순서
+_last_sweep = time.monotonic()
+_stats = {
+    'created': 0,
+    'evicted_idle': 0,
+    'evicted_cap': 0,
+}
+
+
+def _sweep(now: float) -> None:
+    # _lock 을 잡은 상태에서만 호출
+    global _last_sweep
+    _last_sweep = now
+    while _sessions:
+        session_id, state = next(iter(_sessions.items()))
+        if now - state.last_seen < SESSION_IDLE_TIMEOUT:
+            break
+        del _sessions[session_id]
+        _stats['evicted_idle'] += 1
+
+
+def get_session(session_id: Optional[str]) -> SessionState:
+    """Session state for a Gradio session hash, created on first use"""
+    session_id = session_id or 'default'
+    now = time.monotonic()
+    with _lock:
+        if now - _last_sweep > SWEEP_INTERVAL:
+            _sweep(now)
+
+        state = _sessions.get(session_id)
+        if state is None:
+            state = _sessions[session_id] = SessionState(session_id)
+            _stats['created'] += 1
+            while len(_sessions) > SESSION_MAX:
+                _sessions.popitem(last=False)
+                _stats['evicted_cap'] += 1
+        else:
+            _sessions.move_to_end(session_id)
+        state.last_seen = now
+        return state
+
+
+def find_session(session_id: str) -> Optional[SessionState]:
+    """Existing session state without creating or touching it"""
+    with _lock:
+        return _sessions.get(session_id)
+
+
+def _state_size(state: SessionState) -> int:
+    size = sys.getsizeof(state.fruit_count) + sys.getsizeof(state.price_dict) + sys.getsizeof(state.image_read)
+    size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in state.fruit_count.items())
+    size += sum(sys.getsizeof(k) for k in state.price_dict)
+    size += sum(sys.getsizeof(path) for path in state.image_read)
+    size += sum(int(df.memory_usage(deep=True).sum()) for df in state.price_tables.values())
+    if state.combined_price_df is not None:
+        size += int(state.combined_price_df.memory_usage(deep=True).sum())
+    return size
+
+
+def memory_report() -> Dict:
+    """Session count, stored uploads and approximate bytes held by session state"""
+    with _lock:
+        _sweep(time.monotonic())
+        states = list(_sessions.values())
+        report = dict(_stats)
+    report['sessions'] = len(states)
+    report['images'] = sum(len(state.image_read) for state in states)
+    report['approx_bytes'] = sum(_state_size(state) for state in states)
+    report['max_sessions'] = SESSION_MAX
+    report['max_images_per_session'] = SESSION_MAX_IMAGES
+    report['idle_timeout'] = SESSION_IDLE_TIMEOUT
+    try:
+        import resource
+        report['process_max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:  # Windows
+        pass
+    return report
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# 여러 uvicorn 워커(프로세스)가 함께 쓰는 캐시 계층
+# 프로세스 메모리 캐시(TTLCache, prediction_cache) 뒤에 두고, 미스가 나면 여기서 먼저 찾음
+# 같은 키를 여러 프로세스가 동시에 놓치면 잠금을 얻은 한 프로세스만 KAMIS/Custom Vision 을 호출하고
+# 나머지는 그 결과가 저장될 때까지 기다림
+#   SHARED_CACHE_URL=sqlite:///shared_cache.db  (기본값, 같은 서버의 워커끼리 공유)
+#   SHARED_CACHE_URL=redis://localhost:6379/0   (여러 서버가 공유, redis 패키지 필요)
+#   SHARED_CACHE_URL=none                       (사용 안 함)
+SHARED_CACHE_URL = os.environ.get("SHARED_CACHE_URL", "sqlite:///shared_cache.db")
+SHARED_CACHE_MAX_ROWS = int(os.environ.get("SHARED_CACHE_MAX_ROWS", "100000"))  # SQLite 항목 수 상한
+SHARED_LOCK_TTL = float(os.environ.get("SHARED_LOCK_TTL", "30"))  # 로딩 잠금 최대 유지 시간 (초)
+SHARED_WAIT_POLL = 0.05  # 다른 프로세스의 결과를 기다릴 때 확인 간격 (초)
+
+TRIM_EVERY = 100  # SQLite 만료 항목 정리 주기 (저장 횟수)
+
+# 잠금 소유자 표시 (다른 프로세스의 잠금을 풀지 않도록)
+_owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+
+class SQLiteBackend:
+    """Shared cache in one SQLite file; works across processes on one host"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_locks ("
+            " key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @classmethod
+    def from_url(cls, url: str) -> 'SQLiteBackend':
+        return cls(url[len("sqlite:///"):] or "shared_cache.db")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)", (key, value, now + ttl))
+            self._writes += 1
+            if self._writes % TRIM_EVERY == 0:
+                self._db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    " SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (SHARED_CACHE_MAX_ROWS,)
+                )
+            self._db.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self, prefix: str = '') -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache_entries WHERE key LIKE ?", (prefix + '%',))
+            self._db.commit()
+
+    def try_lock(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._db.execute("DELETE FROM cache_locks WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = self._db.execute("INSERT OR IGNORE INTO cache_locks VALUES (?, ?, ?)", (key, _owner, now + ttl))
+            self._db.commit()
+            return cursor.rowcount == 1
+
+    def is_locked(self, key: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT expires_at FROM cache_locks WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def unlock(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache_locks WHERE key = ? AND owner = ?", (key, _owner))
+            self._db.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+class RedisBackend:
+    """Shared cache in Redis; works across hosts"""
+
+    name = 'redis'
+
+    def __init__(self, client):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> 'RedisBackend':
+        import redis  # 선택 의존성 - Redis 를 쓸 때만 필요
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def clear(self, prefix: str = '') -> None:
+        for key in self._client.scan_iter(match=prefix + '*'):
+            if not key.startswith('lock:'):
+                self._client.delete(key)
+
+    def try_lock(self, key: str, ttl: float) -> bool:
+        return bool(self._client.set('lock:' + key, _owner, nx=True, px=max(1, int(ttl * 1000))))
+
+    def is_locked(self, key: str) -> bool:
+        return bool(self._client.exists('lock:' + key))
+
+    def unlock(self, key: str) -> None:
+        if self._client.get('lock:' + key) == _owner:
+            self._client.delete('lock:' + key)
+
+    def size(self) -> int:
+        return self._client.dbsize()
+
+
+# URL scheme -> 백엔드 생성 함수 (다른 저장소를 쓰려면 여기에 추가)
+BACKENDS = {
+    'sqlite': SQLiteBackend.from_url,
+    'redis': RedisBackend.from_url,
+    'rediss': RedisBackend.from_url,
+}
+
+_lock = threading.Lock()
+_backend = None
+_backend_ready = False
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'loads': 0,
+    'waits': 0,
+    'wait_timeouts': 0,
+    'errors': 0,
+}
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def get_backend():
+    """Configured shared backend, or None when SHARED_CACHE_URL is 'none' or unusable"""
+    global _backend, _backend_ready
+    if _backend_ready:
+        return _backend
+    with _lock:
+        if not _backend_ready:
+            scheme = SHARED_CACHE_URL.split(':', 1)[0].lower()
+            factory = BACKENDS.get(scheme)
+            if factory is not None:
+                try:
+                    _backend = factory(SHARED_CACHE_URL)
+                except Exception as e:
+                    # 공유 캐시가 없어도 프로세스 메모리 캐시만으로 동작
+                    print(f"Shared cache disabled ({SHARED_CACHE_URL}): {e}")
+            _backend_ready = True
+    return _backend
+
+
+def get(key: str) -> Optional[Any]:
+    """Decoded shared value, or None on a miss or backend error"""
+    backend = get_backend()
+    if backend is None:
+        return None
+    try:
+        value = backend.get(key)
+    except Exception:
+        _count('errors')
+        return None
+    _count('misses' if value is None else 'hits')
+    return None if value is None else json.loads(value)
+
+
+def put(key: str, value: Any, ttl: float) -> None:
+    """Store a JSON-serialisable value for every worker"""
+    backend = get_backend()
+    if backend is None:
+        return
+    try:
+        backend.set(key, json.dumps(value, ensure_ascii=False), ttl)
+    except Exception:
+        _count('errors')
+
+
+def _is_locked(backend, key: str) -> bool:
+    # 대기 중 백엔드 오류("database is locked", 연결 끊김)는 잠금이 풀린 것으로 보고 직접 로드
+    try:
+        return backend.is_locked(key)
+    except Exception:
+        _count('errors')
+        return False
+
+
+def _unlock(backend, key: str) -> None:
+    # 잠금은 SHARED_LOCK_TTL 뒤 저절로 풀리므로 실패해도 로드한 값은 그대로 반환
+    try:
+        backend.unlock(key)
+    except Exception:
+        _count('errors')
+
+
+def get_or_load(key: str, ttl: float, loader: Callable[[], Any]) -> Any:
+    """Shared value for key, loaded by at most one process at a time"""
+    backend = get_backend()
+    if backend is None:
+        return loader()
+
+    value = get(key)
+    if value is not None:
+        return value
+
+    try:
+        leader = backend.try_lock(key, SHARED_LOCK_TTL)
+    except Exception:
+        _count('errors')
+        return loader()
+
+    if not leader:
+        # 다른 프로세스가 로딩 중 - 결과가 저장되거나 잠금이 풀릴 때까지 대기
+        _count('waits')
+        deadline = time.monotonic() + SHARED_LOCK_TTL
+        while time.monotonic() < deadline:
+            time.sleep(SHARED_WAIT_POLL)
+            value = get(key)
+            if value is not None:
+                return value
+            if not _is_locked(backend, key):
+                break
+        else:
+            _count('wait_timeouts')
+        return loader()
+
+    try:
+        value = loader()
+        _count('loads')
+        put(key, value, ttl)
+        return value
+    finally:
+        _unlock(backend, key)
+
+
+async def get_or_load_async(key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Async variant of get_or_load; backend calls run off the event loop"""
+    backend = get_backend()
+    if backend is None:
+        return await loader()
+
+    value = await asyncio.to_thread(get, key)
+    if value is not None:
+        return value
+
+    try:
+        leader = await asyncio.to_thread(backend.try_lock, key, SHARED_LOCK_TTL)
+    except Exception:
+        _count('errors')
+        return await loader()
+
+    if not leader:
+        _count('waits')
+        deadline = time.monotonic() + SHARED_LOCK_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(SHARED_WAIT_POLL)
+            value = await asyncio.to_thread(get, key)
+            if value is not None:
+                return value
+            if not await asyncio.to_thread(_is_locked, backend, key):
+                break
+        else:
+            _count('wait_timeouts')
+        return await loader()
+
+    try:
+        value = await loader()
+        _count('loads')
+        await asyncio.to_thread(put, key, value, ttl)
+        return value
+    finally:
+        await asyncio.to_thread(_unlock, backend, key)
+
+
+def get_stats() -> Dict:
+    """Backend name, size and hit/miss/wait counters for this process"""
+    backend = get_backend()
+    with _lock:
+        stats = dict(_stats)
+    stats['backend'] = backend.name if backend is not None else None
+    stats['pid'] = os.getpid()
+    try:
+        stats['size'] = backend.size() if backend is not None else 0
+    except Exception:
+        stats['size'] = None
+    return stats
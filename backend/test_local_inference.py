@@ -0,0 +1,68 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import local_inference
+
+LABELS = ['apple_fr', 'apple_low', 'banana_fr']
+
+
+class FakeSession:
+    """onnxruntime.InferenceSession stand-in that returns canned outputs"""
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name='data', shape=['None', 3, 4, 4])]
+
+    def run(self, names, feeds):
+        batch_size = feeds['data'].shape[0]
+        return self.outputs(batch_size)
+
+
+@pytest.fixture
+def load_with(monkeypatch, tmp_path):
+    labels_path = tmp_path / 'labels.txt'
+    labels_path.write_text('\n'.join(LABELS), encoding='utf-8')
+    monkeypatch.setattr(local_inference, 'LOCAL_LABELS_PATH', str(labels_path))
+
+    def load(outputs):
+        fake = types.SimpleNamespace(SessionOptions=lambda: types.SimpleNamespace(),
+                                     InferenceSession=lambda path, sess_options, providers: FakeSession(outputs))
+        monkeypatch.setitem(sys.modules, 'onnxruntime', fake)
+        run, size, layout = local_inference._load_onnx('model.onnx')
+        return run
+
+    return load
+
+
+def test_class_label_output_is_skipped(load_with):
+    # 구버전 export: [classLabel (N, 1) 문자열, loss [{label: prob}]]
+    def outputs(batch_size):
+        return [np.array([['apple_fr']] * batch_size, dtype=object),
+                [{'apple_fr': 0.1, 'apple_low': 0.2, 'banana_fr': 0.7}] * batch_size]
+
+    run = load_with(outputs)
+    probabilities = run(np.zeros((2, 3, 4, 4), dtype=np.float32))
+    assert [LABELS[i] for i in probabilities.argmax(axis=1)] == ['banana_fr', 'banana_fr']
+
+
+def test_float_probability_array_is_used(load_with):
+    def outputs(batch_size):
+        return [np.array([['apple_fr']] * batch_size, dtype=object),
+                np.tile(np.array([[0.2, 0.7, 0.1]], dtype=np.float32), (batch_size, 1))]
+
+    run = load_with(outputs)
+    assert run(np.zeros((3, 3, 4, 4), dtype=np.float32)).argmax(axis=1).tolist() == [1, 1, 1]
+
+
+def test_output_with_wrong_width_is_rejected(load_with):
+    def outputs(batch_size):
+        return [np.zeros((batch_size, 1), dtype=np.float32)]
+
+    run = load_with(outputs)
+    with pytest.raises(ValueError):
+        run(np.zeros((1, 3, 4, 4), dtype=np.float32))
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+
+from ttl_cache import TTLCache
+
+
+def test_concurrent_threads_share_one_load():
+    cache = TTLCache(ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()['coalesced'] < 4:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 5
+    assert len(calls) == 1
+
+
+def test_loader_error_reaches_waiters():
+    cache = TTLCache(ttl=60)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def loader():
+            started.set()
+            await asyncio.sleep(0.01)
+            raise ValueError('upstream down')
+
+        leader = asyncio.ensure_future(cache.get_or_load_async('k', loader))
+        await started.wait()
+        waiter = asyncio.ensure_future(cache.get_or_load_async('k', loader))
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.stats()['load_errors'] == 1
+
+
+def test_cancelled_leader_does_not_fail_waiters():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    async def main():
+        started = asyncio.Event()
+
+        async def loader():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.05)
+            return 'value'
+
+        leader = asyncio.ensure_future(cache.get_or_load_async('k', loader))
+        await started.wait()
+        waiters = [asyncio.ensure_future(cache.get_or_load_async('k', loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ['value'] * 3
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats['load_errors'] == 0
+    assert cache.get('k') == 'value'
+
+
+def test_interrupted_sync_leader_hands_over_to_a_waiter():
+    cache = TTLCache(ttl=60)
+    leader_started = threading.Event()
+    release = threading.Event()
+
+    def interrupted():
+        leader_started.set()
+        release.wait(5)
+        raise KeyboardInterrupt
+
+    def leader():
+        try:
+            cache.get_or_load('k', interrupted)
+        except KeyboardInterrupt:
+            pass
+
+    results = []
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    leader_started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_load('k', lambda: 'value')))
+    waiter.start()
+    while cache.stats()['coalesced'] < 1:
+        pass
+    release.set()
+    leader_thread.join()
+    waiter.join()
+    assert results == ['value']
+    assert cache.stats()['load_errors'] == 0
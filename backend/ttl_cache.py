@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+# 리더의 로드가 취소/중단된 경우 대기자가 받는 값 - 결과를 공유하지 않고 다시 시도함
+_ABANDONED = object()
+
+
+class _Flight:
+    """One in-progress load that concurrent callers (threads or coroutines) wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None  # 대기자에게도 전달하는 로더 예외 (Exception 만)
+        self.abandoned = False
+        self._waiters = []  # (loop, future) - 코루틴 대기자
+
+    def add_waiter(self) -> asyncio.Future:
+        # TTLCache._lock 을 잡은 상태, 로드가 끝나기 전에만 호출
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append((loop, future))
+        return future
+
+    def _resolve(self, future: asyncio.Future) -> None:
+        if future.done():
+            return
+        if self.abandoned:
+            future.set_result(_ABANDONED)
+        elif self.error is not None:
+            future.set_exception(self.error)
+            future.exception()  # 대기자가 취소됐을 때 "never retrieved" 경고 방지
+        else:
+            future.set_result(self.value)
+
+    def finish(self) -> None:
+        """Wake every waiting thread and coroutine"""
+        self.event.set()
+        for loop, future in self._waiters:
+            try:
+                loop.call_soon_threadsafe(self._resolve, future)
+            except RuntimeError:  # 대기자의 이벤트 루프가 이미 종료됨
+                pass
+
+
+class TTLCache:
+    """Bounded, thread-safe TTL cache with single-flight loading.
+
+    Expiry uses time.monotonic(), so wall-clock changes and day boundaries do not
+    affect it. When several callers miss on the same key at once, only the first
+    runs the loader; the rest wait for its result (counted as "coalesced").
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256, name: str = ''):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (value, 만료 시각)
+        # 동기/비동기 호출이 같은 진행 중 로드를 공유 (한 키에 외부 호출 1회)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'expired': 0,
+            'evictions': 0,
+        }
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        # self._lock 을 잡은 상태에서만 호출
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._stats['expired'] += 1
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        # self._lock 을 잡은 상태에서만 호출
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value or None (counts a hit or a miss)"""
+        with self._lock:
+            found, value = self._lookup(key)
+            self._stats['hits' if found else 'misses'] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value, or load it once no matter how many threads miss together"""
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self._stats['hits'] += 1
+                    return value
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self._stats['misses'] += 1
+                else:
+                    self._stats['coalesced'] += 1
+
+            if leader:
+                break
+            flight.event.wait()
+            if flight.abandoned:
+                continue  # 리더가 중단됨 - 이 스레드가 다시 로드를 맡거나 새 로드를 기다림
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            # KeyboardInterrupt 등 - 리더 자신의 중단이라 대기자에게는 전달하지 않음
+            flight.abandoned = True
+            raise
+        finally:
+            self._land(key, flight)
+        return flight.value
+
+    def _land(self, key: Hashable, flight: _Flight) -> None:
+        # 리더가 로드를 끝낸 뒤 호출 - 결과 저장 후 대기자 깨움
+        with self._lock:
+            if not flight.abandoned:
+                self._stats['loads'] += 1
+                if flight.error is None:
+                    self._store(key, flight.value)
+                else:
+                    self._stats['load_errors'] += 1
+            del self._flights[key]
+        flight.finish()
+
+    def _land_task(self, key: Hashable, flight: _Flight, task: asyncio.Future) -> None:
+        # 비동기 로드 태스크가 끝나면 호출 (리더 요청이 취소됐어도 태스크는 끝까지 실행됨)
+        if task.cancelled():
+            flight.abandoned = True
+        elif task.exception() is not None:
+            if isinstance(task.exception(), Exception):
+                flight.error = task.exception()
+            else:
+                flight.abandoned = True
+        else:
+            flight.value = task.result()
+        self._land(key, flight)
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of get_or_load; shares one load with concurrent coroutines and threads.
+
+        The load runs as its own task, so cancelling the caller that started it
+        (e.g. a disconnected client) does not cancel it for the other waiters.
+        """
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self._stats['hits'] += 1
+                    return value
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self._stats['misses'] += 1
+                else:
+                    waiter = flight.add_waiter()
+                    self._stats['coalesced'] += 1
+
+            if leader:
+                break
+            value = await asyncio.shield(waiter)
+            if value is not _ABANDONED:
+                return value
+
+        try:
+            task = asyncio.ensure_future(loader())
+        except BaseException as e:
+            # 코루틴을 만들지도 못함 - 리더 혼자 실패
+            if isinstance(e, Exception):
+                flight.error = e
+            else:
+                flight.abandoned = True
+            self._land(key, flight)
+            raise
+        task.add_done_callback(lambda done: self._land_task(key, flight, done))
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss/coalesce counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._data)
+        stats['name'] = self.name
+        stats['ttl'] = self.ttl
+        stats['maxsize'] = self.maxsize
+        return stats
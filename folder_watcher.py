@@ -0,0 +1,240 @@
+import errno
+import hashlib
+import os
+import queue
+import shutil
+import threading
+import time
+import concurrent.futures
+from collections import deque
+
+# 입고 폴더 감시 - 새 이미지가 생기면 바로 분류로 넘기고 처리 폴더로 옮김
+# watchdog(inotify 등 파일시스템 알림)이 설치되어 있으면 사용하고, 없으면 주기적으로 폴더를 확인
+# 복사 중인 파일은 크기/수정 시간이 SETTLE_SECONDS 동안 바뀌지 않을 때까지 기다렸다가 처리
+SETTLE_SECONDS = float(os.environ.get("WATCH_SETTLE_SECONDS", "1.0"))  # 쓰기가 끝났다고 보는 대기 시간
+POLL_INTERVAL = float(os.environ.get("WATCH_POLL_INTERVAL", "1.0"))    # 알림을 못 쓸 때 폴더 확인 간격
+SEEN_FILE = ".ingested"  # 처리 폴더에 남기는 처리 완료 이미지 해시 목록 (재시작 후에도 중복 제거)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def move_atomic(path, folder):
+    """Move into folder without clobbering; the file appears there in one rename"""
+    name, ext = os.path.splitext(os.path.basename(path))
+    target = os.path.join(folder, name + ext)
+    n = 1
+    while os.path.exists(target):
+        target = os.path.join(folder, f"{name}_{n}{ext}")
+        n += 1
+    try:
+        os.rename(path, target)
+    except OSError as e:
+        # 잠긴 파일(PermissionError), 이름 충돌(FileExistsError) 등은 그대로 실패 - 복사는 다른 드라이브일 때만
+        if e.errno != errno.EXDEV:
+            raise
+        # 처리 폴더 안에 임시 파일로 복사한 뒤 이름만 바꿔서 반쯤 복사된 파일이 보이지 않게 함
+        partial = target + ".part"
+        shutil.copy2(path, partial)
+        os.replace(partial, target)
+        try:
+            os.remove(path)
+        except OSError:
+            # 원본을 못 지우면 복사본을 지워서 양쪽 폴더에 남지 않게 함 (다음에 다시 처리)
+            os.remove(target)
+            raise
+    return target
+
+
+class FolderWatcher:
+    """Feed images landing in `folder` to `classify(path)` and move them to `done_folder`"""
+
+    def __init__(self, folder, done_folder, classify, max_in_flight=4,
+                 extensions=(".jpg", ".jpeg", ".png", ".bmp", ".gif"), should_stop=lambda: False):
+        self.folder = folder
+        self.done_folder = done_folder
+        self.classify = classify
+        self.max_in_flight = max_in_flight
+        self.extensions = extensions
+        self.should_stop = should_stop
+        self._events = queue.Queue()  # 알림/폴링으로 들어온 경로
+        self._settling = {}           # path -> (size, mtime, 마지막으로 바뀐 시각)
+        self._ready = deque()         # 쓰기가 끝나서 분류를 기다리는 경로
+        self._known = set()           # 이번 실행에서 이미 맡은 경로 (처리 중 / 실패 포함)
+        self._lock = threading.Lock()
+        self._seen = self._load_seen()  # 처리 완료된 이미지 해시
+        self._hashing = set()           # 지금 분류 중인 이미지 해시
+        self.stats = {'classified': 0, 'duplicates': 0, 'errors': 0}
+
+    def _load_seen(self):
+        try:
+            with open(os.path.join(self.done_folder, SEEN_FILE), encoding="utf-8") as f:
+                return set(line.strip() for line in f if line.strip())
+        except OSError:
+            return set()
+
+    def _remember(self, digest):
+        with self._lock:
+            self._seen.add(digest)
+            with open(os.path.join(self.done_folder, SEEN_FILE), "a", encoding="utf-8") as f:
+                f.write(digest + "\n")
+
+    def notify(self, path):
+        """Called from the filesystem observer thread for created / modified / moved-in files"""
+        if path.lower().endswith(self.extensions):
+            self._events.put(path)
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            print(f"👀 watchdog not installed, checking {self.folder} every {POLL_INTERVAL}s")
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.dest_path)
+
+        observer = Observer()
+        observer.schedule(Handler(), self.folder, recursive=False)
+        observer.start()
+        print(f"👀 Watching {self.folder}")
+        return observer
+
+    def _scan(self):
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.path not in self._known:
+                    self.notify(entry.path)
+
+    def _update_settling(self, now):
+        # 새로 들어온 경로 반영
+        while True:
+            try:
+                path = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if path not in self._known:
+                self._settling.setdefault(path, (-1, -1, now))
+
+        for path, (size, mtime, since) in list(self._settling.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._settling[path]  # 쓰기 전에 지워지거나 이름이 바뀜 - 새 이름으로 알림이 다시 옴
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self._settling[path] = (stat.st_size, stat.st_mtime, now)
+            elif stat.st_size > 0 and now - since >= SETTLE_SECONDS:
+                del self._settling[path]
+                self._known.add(path)
+                self._ready.append(path)
+
+    def _process(self, path):
+        try:
+            digest = file_hash(path)
+        except OSError as e:
+            print(f"❌ Error reading {path}: {e}")
+            return 'error'
+
+        with self._lock:
+            if digest in self._hashing:
+                return 'retry'  # 같은 내용의 이미지가 분류 중 - 결과를 보고 다시 판단
+            duplicate = digest in self._seen
+            if not duplicate:
+                self._hashing.add(digest)
+
+        if duplicate:
+            try:
+                move_atomic(path, self.done_folder)
+            except OSError as e:
+                print(f"❌ Error moving duplicate {path}: {e}")
+                return 'error'
+            print(f"♻️ Skipped duplicate {os.path.basename(path)}")
+            return 'duplicate'
+
+        try:
+            result = self.classify(path)
+        except Exception as e:
+            # 실패한 파일은 입고 폴더에 그대로 두어서 다음 시작 때 다시 처리
+            print(f"❌ Error uploading {path}: {e}")
+            with self._lock:
+                self._hashing.discard(digest)
+            return 'error'
+
+        try:
+            # 서버에는 이미 집계됨 - 이동에 실패해도 다음 시작 때 중복으로 건너뛰도록 해시부터 기록
+            self._remember(digest)
+            move_atomic(path, self.done_folder)
+        except OSError as e:
+            print(f"❌ Error moving {path}: {e}")
+        finally:
+            with self._lock:
+                self._hashing.discard(digest)
+        print(f"✅ {os.path.basename(path)}: {result.get('tag', result) if isinstance(result, dict) else result}")
+        return 'classified'
+
+    def run(self):
+        """Process files already in the folder, then new arrivals, until should_stop()"""
+        os.makedirs(self.done_folder, exist_ok=True)
+        observer = self._start_observer()
+        self._scan()  # 감시 시작 전에 이미 있던 파일
+        last_scan = time.monotonic()
+        pending = {}  # future -> path
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            try:
+                while not self.should_stop():
+                    now = time.monotonic()
+                    if observer is None and now - last_scan >= POLL_INTERVAL:
+                        self._scan()
+                        last_scan = now
+                    self._update_settling(now)
+
+                    while self._ready and len(pending) < self.max_in_flight:
+                        path = self._ready.popleft()
+                        pending[executor.submit(self._process, path)] = path
+
+                    # 분류 결과를 기다리되, 쓰기 완료 확인 / 정지 확인을 위해 짧게 끊음
+                    finished, _ = concurrent.futures.wait(pending, timeout=0.2,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        self._finish(pending.pop(future), future.result())
+            finally:
+                if observer is not None:
+                    observer.stop()
+                    observer.join()
+                # 정지 후에도 이미 보낸 이미지는 결과를 기다렸다가 정리
+                for future in concurrent.futures.as_completed(pending):
+                    self._finish(pending.pop(future), future.result())
+
+        print(f"🛑 Folder watch stopped: {self.stats['classified']} classified, "
+              f"{self.stats['duplicates']} duplicates, {self.stats['errors']} errors")
+
+    def _finish(self, path, outcome):
+        if outcome == 'retry':
+            self._known.discard(path)
+            self._events.put(path)
+        elif outcome == 'duplicate':
+            self.stats['duplicates'] += 1
+        elif outcome == 'classified':
+            self.stats['classified'] += 1
+        else:
+            self.stats['errors'] += 1
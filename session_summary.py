@@ -0,0 +1,53 @@
+import threading
+
+import voice_phrases
+
+# "말해줘" 요약용 누적 집계 - 분류 결과가 올 때마다 갱신해서 말할 때는 그룹 수만큼만 훑음
+# (화면 테이블을 다시 긁어서 DataFrame 으로 만들고 groupby 하지 않음)
+PRICED_CONDITIONS = ('fr', 'low')  # 'rot' 은 가격 정보 없음
+
+
+class SessionSummary:
+    """Running counts per (product, condition) and the top price with its regions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}       # (product, condition) -> 개수, 처음 나온 순서
+        self.best_prices = {}  # (product, condition) -> (최고가, [지역], 단위)
+        self._requested = set()  # 가격을 조회 중이거나 조회한 (product, condition)
+
+    def add_classification(self, product, condition):
+        """Count one result; True when its prices still need to be fetched"""
+        key = (product, condition)
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            if condition not in PRICED_CONDITIONS or key in self._requested:
+                return False
+            self._requested.add(key)
+            return True
+
+    def add_prices(self, product, condition, records):
+        """records: [{'region', 'price' (int), 'unit'}] from /api/prices"""
+        if not records:
+            return
+        best = max(record['price'] for record in records)
+        regions = [record['region'] for record in records if record['price'] == best]
+        with self._lock:
+            self.best_prices[(product, condition)] = (best, regions, records[0]['unit'])
+
+    def price_failed(self, product, condition):
+        # 다음 결과가 올 때 다시 조회
+        with self._lock:
+            self._requested.discard((product, condition))
+
+    def count_text(self, language='ko-KR'):
+        with self._lock:
+            counts = list(self.counts.items())
+        return voice_phrases.count_text(counts, language)
+
+    def price_text(self, language='ko-KR'):
+        products = voice_phrases.PRODUCT_NAMES['ko-KR']
+        with self._lock:
+            best_prices = sorted(self.best_prices.items(),
+                                 key=lambda item: (products.get(item[0][0], item[0][0]), item[0][1]))
+        return voice_phrases.price_text(best_prices, language)
@@ -11,17 +11,107 @@ from webdriver_manager.microsoft import EdgeChromiumDriverManager
 import threading
 from bs4 import BeautifulSoup
 import pandas as pd
-from googletrans import Translator
-import asyncio
-import shutil
+import concurrent.futures
+import uuid
+import requests
+import folder_watcher
+import session_summary
+import voice_phrases
+import tts_cache
 
 speech_key = "#speech_key#"
 service_region = "eastus"
 language = 'ko-KR'
 
+# 언어별 안내 목소리
+VOICE_NAMES = {
+    "ko-KR": "ko-KR-JiMinNeural",
+    "en-US": "en-US-AndrewMultilingualNeural",
+    "ja-JP": "ja-JP-NanamiNeural",
+}
+
+# 업로드할 이미지 폴더 / 분류가 끝난 이미지를 옮길 폴더
+IMAGE_FOLDER = "C:/Users/volav/ms_doeun/2025.02/1stProject12team/images"
+DONE_FOLDER = "C:/Users/volav/ms_doeun/2025.02/1stProject12team/temp"
+# 유효한 이미지 확장자
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+# 업로드 방식 - 'browser': Gradio 화면의 파일 입력에 하나씩 넣음, 'api': 백엔드 /api/classify 로 바로 전송
+#              'watch': 'api' 처럼 보내되, 정지할 때까지 폴더를 감시하며 새로 들어온 이미지도 바로 전송
+UPLOAD_MODE = os.environ.get("UPLOAD_MODE", "browser")
+API_URL = os.environ.get("FRUIT_API_URL", "http://127.0.0.1:8000").rstrip("/")
+UPLOAD_IN_FLIGHT = int(os.environ.get("UPLOAD_IN_FLIGHT", "4"))  # 'api' 모드에서 동시에 보내는 이미지 수
+UPLOAD_TIMEOUT = 60  # 이미지 한 장 분류 응답 대기 (초)
+UPLOAD_RETRIES = 3   # 서버 대기열이 가득 찼을 때(503) 재시도 횟수
+# 'api' 모드 분류 결과가 누적되는 세션 (/api/sessions/<SESSION_ID>/counts 로 조회)
+SESSION_ID = os.environ.get("FRUIT_SESSION_ID", f"voice-{uuid.uuid4().hex[:12]}")
+
+# 언어 전환 방식 - 'pool': 언어별 인식기/합성기를 미리 만들어 두고 교체만 함 (새 인식기가 듣기 시작할 때까지 이전 인식기가 계속 들음)
+#                 'restart': 이전 방식, 멈춘 뒤 새로 만들어서 시작 (전환 공백 비교 측정용)
+LANGUAGE_SWITCH_MODE = os.environ.get("LANGUAGE_SWITCH_MODE", "pool")
+
 should_stop = False
 upload_thread = None
 driver = None
+_http = threading.local()  # 업로드 스레드별 HTTP 세션
+summary = session_summary.SessionSummary()  # 'api' / 'watch' 모드의 "말해줘" 요약 (결과가 올 때마다 갱신)
+# 'browser' 모드에서 긁어온 한국어 화면 테이블의 표시값 -> 요약 템플릿에 넣을 코드
+PRODUCT_CODES = {name: code for code, name in voice_phrases.PRODUCT_NAMES['ko-KR'].items()}
+QUALITY_CODES = (('🟢', 'fr'), ('🟠', 'low'), ('🔴', 'rot'), ('신선해요', 'fr'), ('떨이', 'low'), ('버려', 'rot'))
+
+class LanguageSwitchTimer:
+    """언어 전환 때 음성 인식이 끊긴 시간 측정 (이전 인식기가 듣기를 넘긴 시점 ~ 새 인식기 세션 시작)
+    듣지 않는 인식기가 낸 결과(버린 발화)는 따로 셈"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._switch = None
+        self.gaps = []    # (mode, 공백 ms, 새 인식기 준비 ms)
+        self.dropped = 0  # 듣기를 넘긴 뒤 이전 인식기가 낸 결과 수
+
+    def begin(self, old_lang, new_lang):
+        with self._lock:
+            self._switch = {'from': old_lang, 'to': new_lang, 'at': time.perf_counter(), 'stopped': None, 'started': None}
+
+    def cancel(self):
+        with self._lock:
+            self._switch = None
+
+    def heard(self, handled):
+        """Every recognized event; handled is False when it came from a recognizer that is no longer listening"""
+        if not handled:
+            with self._lock:
+                self.dropped += 1
+
+    def old_stopped(self):
+        # 'restart': 이전 인식기를 멈출 때, 'pool': 새 인식기에 듣기를 넘길 때
+        self._mark('stopped')
+
+    def new_started(self):
+        self._mark('started')
+
+    def _mark(self, name):
+        with self._lock:
+            switch = self._switch
+            if switch is None or switch[name] is not None:
+                return
+            switch[name] = time.perf_counter()
+            if switch['stopped'] is None or switch['started'] is None:
+                return
+            self._switch = None
+        gap_ms = max(0.0, switch['started'] - switch['stopped']) * 1000
+        ready_ms = (switch['started'] - switch['at']) * 1000
+        self.gaps.append((LANGUAGE_SWITCH_MODE, gap_ms, ready_ms))
+        print(f"⏱️ {switch['from']} -> {switch['to']} ({LANGUAGE_SWITCH_MODE}): "
+              f"recognition gap {gap_ms:.0f} ms, new recognizer ready after {ready_ms:.0f} ms")
+
+    def report(self):
+        if self.gaps:
+            average = sum(gap for _, gap, _ in self.gaps) / len(self.gaps)
+            worst = max(gap for _, gap, _ in self.gaps)
+            print(f"⏱️ {len(self.gaps)} language switches ({LANGUAGE_SWITCH_MODE}): "
+                  f"average gap {average:.0f} ms, worst {worst:.0f} ms, {self.dropped} utterances dropped")
+
 
 def connect_to_existing_browser():
     """기존 엣지 브라우저에 연결"""
@@ -61,13 +151,16 @@ def browser_connect() :
         print(f"❌ Error in upload automation: {e}")
 
 def upload_image_automation():
-    global should_stop, driver
-    
-    # 업로드할 이미지 폴더
-    IMAGE_FOLDER = "C:/Users/volav/ms_doeun/2025.02/1stProject12team/images"
-    # 유효한 이미지 확장자
-    VALID_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
-    
+    if UPLOAD_MODE == "watch":
+        print(f"🔗 API upload session: {SESSION_ID}")
+        folder_watcher.FolderWatcher(
+            IMAGE_FOLDER, DONE_FOLDER, classify_via_api,
+            max_in_flight=UPLOAD_IN_FLIGHT,
+            extensions=VALID_EXTENSIONS,
+            should_stop=lambda: should_stop,
+        ).run()
+        return
+
     image_files = [
         os.path.join(IMAGE_FOLDER, f) 
         for f in os.listdir(IMAGE_FOLDER) 
@@ -78,6 +171,100 @@ def upload_image_automation():
         print("❌ No images found in the folder.")
         return
 
+    if UPLOAD_MODE == "api":
+        upload_images_api(image_files)
+    else:
+        upload_images_browser(image_files)
+
+
+def classify_via_api(image_path):
+    """이미지 한 장을 백엔드로 보내고 분류 결과를 받음 (서버가 세션에 집계한 뒤 응답)"""
+    if getattr(_http, "session", None) is None:
+        _http.session = requests.Session()
+    with open(image_path, "rb") as f:
+        image = f.read()
+
+    for attempt in range(UPLOAD_RETRIES + 1):
+        response = _http.session.post(
+            f"{API_URL}/api/classify",
+            params={"session_id": SESSION_ID},
+            data=image,
+            headers={"Content-Type": "application/octet-stream", "X-Filename": os.path.basename(image_path)},
+            timeout=UPLOAD_TIMEOUT,
+        )
+        # 대기열이 가득 참 - 서버가 알려준 시간만큼 쉬었다가 다시 보냄
+        if response.status_code == 503 and attempt < UPLOAD_RETRIES and not should_stop:
+            time.sleep(float(response.headers.get("Retry-After", "1")))
+            continue
+        response.raise_for_status()
+        result = response.json()
+        record_result(result)
+        return result
+
+
+def record_result(result):
+    """분류 결과를 누적 요약에 반영하고, 처음 나온 품목/상태면 가격을 한 번 조회"""
+    product, condition = result["product"], result["condition"]
+    if not summary.add_classification(product, condition):
+        return
+    try:
+        response = _http.session.get(f"{API_URL}/api/prices/{product}", params={"condition": condition},
+                                     timeout=UPLOAD_TIMEOUT)
+        response.raise_for_status()
+        summary.add_prices(product, condition, response.json()["prices"])
+    except Exception as e:
+        # 분류는 서버에 이미 집계됐으므로 업로드는 성공으로 두고 가격만 다음 결과 때 다시 조회
+        print(f"❌ Error fetching prices for {product}_{condition}: {e}")
+        summary.price_failed(product, condition)
+
+
+def upload_images_api(image_files):
+    """최대 UPLOAD_IN_FLIGHT 장을 동시에 보내고, 결과를 받은 파일만 DONE_FOLDER 로 이동"""
+    total = len(image_files)
+    done_count = 0
+    pending = {}  # future -> image_path
+    queued = iter(enumerate(image_files, 1))
+    print(f"🔗 API upload session: {SESSION_ID}")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=UPLOAD_IN_FLIGHT) as executor:
+        while True:
+            # 정지 명령 전까지는 전송 중인 이미지가 UPLOAD_IN_FLIGHT 장이 되도록 채움
+            while not should_stop and len(pending) < UPLOAD_IN_FLIGHT:
+                item = next(queued, None)
+                if item is None:
+                    break
+                i, image_path = item
+                print(f"📤 Uploading {i}/{total}: {os.path.basename(image_path)}...")
+                pending[executor.submit(classify_via_api, image_path)] = image_path
+
+            # 정지 후에도 이미 보낸 이미지는 결과를 기다렸다가 정리 (서버에는 이미 집계됨)
+            if not pending:
+                break
+
+            finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                image_path = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 결과를 못 받은 파일은 그대로 두어서 다음 시작 때 다시 보냄
+                    print(f"❌ Error uploading {image_path}: {e}")
+                    continue
+                done_count += 1
+                print(f"✅ {done_count}/{total} {os.path.basename(image_path)}: {result['tag']}")
+                try:
+                    # 서버에는 이미 집계됨 - 같은 이름의 파일이 있어도 실패하지 않게 이름을 바꿔서 이동
+                    folder_watcher.move_atomic(image_path, DONE_FOLDER)
+                except OSError as e:
+                    print(f"❌ Error moving {image_path}: {e}")
+
+    if should_stop:
+        print(f"🛑 Upload process stopped by user ({done_count}/{total} done)")
+
+
+def upload_images_browser(image_files):
+    global should_stop, driver
+
     for i, image_path in enumerate(image_files, 1):
         if should_stop:
             print("🛑 Upload process stopped by user")
@@ -95,9 +282,7 @@ def upload_image_automation():
             print(f"✅ Upload successful!")
             time.sleep(5)  # 업로드 대기
         
-            source_path = image_path
-            destination_folder = "C:/Users/volav/ms_doeun/2025.02/1stProject12team/temp"
-            shutil.move(source_path, destination_folder)
+            folder_watcher.move_atomic(image_path, DONE_FOLDER)
 
         except Exception as e:
             print(f"❌ Error uploading {image_path}: {e}")
@@ -142,54 +327,34 @@ def scrape_table_data():
     return df_1, df_2
 
 
-def countdf_to_text(countdf) :
+def countdf_to_counts(countdf):
+    """개수 테이블 -> [((product, condition), count)] (voice_phrases.count_text 입력)"""
     def format_quality(quality):
-        if "신선해요" in quality:
-            return "신선한"
-        elif "떨이" in quality:
-            return "저품질"
-        elif "버려" in quality:
-            return "버릴"
+        for mark, condition in QUALITY_CODES:
+            if mark in quality:
+                return condition
         return quality  # 기타 경우 처리
 
-    # 요약 문장 생성
-    summary = [f"{format_quality(row['품질'])} {row['품목']} {row['개수']}개"
-            for _, row in countdf.iterrows()]
-
-    # 최종 결과 출력
-    result = ", ".join(summary)
-    return result + "입니다."
+    return [((PRODUCT_CODES.get(item, item), format_quality(quality)), count)
+            for item, quality, count in zip(countdf['품목'], countdf['품질'], countdf['개수'])]
 
 
-def pricedf_to_text(pricedf) :
-    # 상태 변환 함수
-    def format_status(status):
-        if status == "fr":
-            return "신선한"
-        elif status == "low":
-            return "저품질"
-        return status  # 기타 상태 처리 가능
+def pricedf_to_best_prices(pricedf):
+    """가격 테이블 -> [((product, condition), (최고가, [지역], 단위))] (voice_phrases.price_text 입력)"""
+    # 화면의 가격은 "12,345" 같은 문자열 - 숫자로 바꿔야 최고가 비교가 맞음
+    pricedf = pricedf.assign(도매가격=pd.to_numeric(pricedf["도매가격"].str.replace(",", "")))
 
     # 품목별 & 상태별 그룹화
     grouped = pricedf.groupby(["품목", "상태"])
 
-    # 문장 리스트 생성
-    sentences = []
-
+    best_prices = []
     for (item, status), group in grouped:
-        status_text = format_status(status)
         max_price = group["도매가격"].max()  # 최고 가격 찾기
         max_rows = group[group["도매가격"] == max_price]  # 최고 가격과 같은 행 찾기
-        regions = ", ".join(max_rows["지역"].tolist())  # 지역 리스트 만들기
+        regions = max_rows["지역"].tolist()  # 지역 리스트 만들기
         unit = max_rows["단위"].iloc[0]  # 단위 가져오기
-
-        sentence = (f"{status_text} {item}의 경우, {unit} 단위로 판매되고 있으며 "
-                    f"현재 {regions}에서 가장 높은 도매가격 {max_price}원에 거래되고 있습니다.")
-        sentences.append(sentence)
-    sentence_sum = ''
-    for str in sentences :
-        sentence_sum += str +' '
-    return sentence_sum
+        best_prices.append(((PRODUCT_CODES.get(item, item), status), (int(max_price), regions, unit)))
+    return best_prices
 
 
 def click_download(str):
@@ -211,79 +376,123 @@ def click_download(str):
         print(f"❌ Error in click download: {e}")
 
 
-async def translate_text(text, src_lang, dest_lang):
-    translator = Translator()
-    translated = await translator.translate(text, src=src_lang, dest=dest_lang)
-    return translated.text
-
-
+_wav_synthesizers = {}  # voice_name -> 파일 캐시용 합성기 (스피커 출력 없음)
+_wav_lock = threading.Lock()
 
+def synthesize_wav(voice_name, text):
+    """음성 합성 결과를 WAV 바이트로 받음 (tts_cache 가 디스크에 저장)"""
+    with _wav_lock:
+        synthesizer = _wav_synthesizers.get(voice_name)
+        if synthesizer is None:
+            speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+            speech_config.speech_synthesis_voice_name = voice_name
+            speech_config.set_speech_synthesis_output_format(speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm)
+            synthesizer = _wav_synthesizers[voice_name] = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+    result = synthesizer.speak_text_async(text).get()
+    if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+        raise RuntimeError(f"Speech synthesis failed: {result.reason}")
+    return result.audio_data
 
 
 def speech_recognize_continuous_async_from_microphone():
     global should_stop, upload_thread, driver, language
-    loop = asyncio.get_event_loop()
 
     def create_speech_recognizer(lang):
         speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region, speech_recognition_language=lang)
         audio_config = speechsdk.audio.AudioConfig(use_default_microphone=True)
         return speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
     
-    def create_speech_synthesizer(voice_name):
-        speech_config2 = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
-        speech_config2.speech_synthesis_voice_name = voice_name
-        return speechsdk.SpeechSynthesizer(speech_config=speech_config2)
-    
-    voice_name = "ko-KR-JiMinNeural"
-    speech_recognizer = create_speech_recognizer(language)
-    speech_synthesizer = create_speech_synthesizer(voice_name)
+    # 고정 안내 문구는 디스크 캐시에서 재생 - 세 가지 목소리 모두 미리 합성
+    tts = tts_cache.TTSCache(synthesize_wav)
+    tts.prewarm_async((VOICE_NAMES[lang], voice_phrases.phrase(key, lang))
+                      for key in voice_phrases.FIXED_PROMPTS for lang in VOICE_NAMES)
+
+    voice_name = VOICE_NAMES[language]
     done = False
+    switch_timer = LanguageSwitchTimer()
+    listening_language = language  # 명령을 받아들이는 인식기의 언어
+    previous_recognizer = None      # 'pool' 전환 중 새 인식기가 시작되면 멈출 이전 인식기
     
     
+    def switch_language(new_language):
+        nonlocal speech_recognizer, voice_name, listening_language, previous_recognizer
+        global language
+        if new_language == language:
+            return
+        old_recognizer = speech_recognizer
+        language = new_language
+        voice_name = VOICE_NAMES[new_language]
+
+        if LANGUAGE_SWITCH_MODE == "pool" and previous_recognizer is recognizers[new_language]:
+            # 새 인식기가 시작되기 전에 원래 언어로 돌아옴 - 아직 듣고 있는 이전 인식기를 그대로 씀
+            old_recognizer.stop_continuous_recognition_async()
+            speech_recognizer = previous_recognizer
+            previous_recognizer = None
+            switch_timer.cancel()
+            return
+
+        switch_timer.begin(listening_language, new_language)
+        if LANGUAGE_SWITCH_MODE == "restart":
+            listening_language = new_language
+            old_recognizer.stop_continuous_recognition_async()
+            switch_timer.old_stopped()
+            speech_recognizer = create_speech_recognizer(new_language)
+            setup_event_handlers(speech_recognizer, new_language)
+            speech_recognizer.start_continuous_recognition_async()
+        else:
+            # 이전 인식기는 새 인식기의 세션이 시작될 때(session_started_cb) 멈춤 - 그 사이 명령도 놓치지 않음
+            if previous_recognizer is None:
+                previous_recognizer = old_recognizer
+            else:
+                old_recognizer.stop_continuous_recognition_async()  # 시작 중이던 인식기는 취소
+            speech_recognizer = recognizers[new_language]
+            speech_recognizer.start_continuous_recognition_async()
+
+    def session_started_cb(lang):
+        nonlocal listening_language, previous_recognizer
+        if lang != language:
+            # 시작하는 사이에 다른 언어로 다시 전환됨 - 필요 없어진 인식기는 멈춤
+            if LANGUAGE_SWITCH_MODE == "pool" and lang != listening_language:
+                recognizers[lang].stop_continuous_recognition_async()
+            return
+        switch_timer.new_started()
+        if previous_recognizer is not None:
+            listening_language = lang
+            switch_timer.old_stopped()
+            previous_recognizer.stop_continuous_recognition_async()
+            previous_recognizer = None
+
     def recognizing_cb(evt: speechsdk.SpeechRecognitionEventArgs):
         return
     
-    def recognized_cb(evt: speechsdk.SpeechRecognitionEventArgs):
-        nonlocal speech_recognizer, speech_synthesizer, done, voice_name  
-        global should_stop, upload_thread, language
+    def recognized_cb(evt: speechsdk.SpeechRecognitionEventArgs, lang):
+        nonlocal done
+        global should_stop, upload_thread
+
+        # 전환 중에는 아직 듣고 있는 쪽(이전 인식기)의 결과만 처리
+        switch_timer.heard(lang == listening_language)
+        if lang != listening_language:
+            return
         
         print(f"인식된 말: {evt.result.text}")
         
         # 언어 변경 로직
         if "영어" in evt.result.text or "잉글리쉬" in evt.result.text or "잉글리시" in evt.result.text or "英語" in evt.result.text or "english" in evt.result.text.lower():
-            language = "en-US"
             print("Switching to English mode...")
-            speech_recognizer.stop_continuous_recognition_async()
-            speech_recognizer = create_speech_recognizer(language)
-            setup_event_handlers(speech_recognizer)
-            speech_recognizer.start_continuous_recognition_async()
-            voice_name = "en-US-AndrewMultilingualNeural"
-            speech_synthesizer = create_speech_synthesizer(voice_name)
-            speech_synthesizer.speak_text_async("Switched to English mode")
+            switch_language("en-US")
+            tts.speak(voice_name, voice_phrases.phrase("switched", language))
             return
         
         elif "한국어" in evt.result.text or "korean" in evt.result.text.lower() or "韓国語" in evt.result.text or "kankokugo" in evt.result.text.lower() :
-            language = "ko-KR"
             print("한국어 모드로 전환합니다...")
-            speech_recognizer.stop_continuous_recognition_async()
-            speech_recognizer = create_speech_recognizer(language)
-            setup_event_handlers(speech_recognizer)
-            speech_recognizer.start_continuous_recognition_async()
-            voice_name = "ko-KR-JiMinNeural"
-            speech_synthesizer = create_speech_synthesizer(voice_name)
-            speech_synthesizer.speak_text_async("한국어 모드로 전환되었습니다")
+            switch_language("ko-KR")
+            tts.speak(voice_name, voice_phrases.phrase("switched", language))
             return
 
         elif "日本語" in evt.result.text or "japanese" in evt.result.text.lower() or "일본어" in evt.result.text or "nihongo" in evt.result.text.lower() :
-            language = "ja-JP"
             print("日本語モードに切り替えます...")
-            speech_recognizer.stop_continuous_recognition_async()
-            speech_recognizer = create_speech_recognizer(language)
-            setup_event_handlers(speech_recognizer)
-            speech_recognizer.start_continuous_recognition_async()
-            voice_name = "ja-JP-NanamiNeural"
-            speech_synthesizer = create_speech_synthesizer(voice_name)
-            speech_synthesizer.speak_text_async("日本語モードに切り替えました")
+            switch_language("ja-JP")
+            tts.speak(voice_name, voice_phrases.phrase("switched", language))
             return
             
         if "끝" in evt.result.text.lower() or "end" in evt.result.text.lower() or "終わり" in evt.result.text.lower():
@@ -293,13 +502,7 @@ def speech_recognize_continuous_async_from_microphone():
         
         elif "시작" in evt.result.text.lower() or "start" in evt.result.text.lower() or "開始" in evt.result.text.lower():
             print("Start classification of Image")
-            if language == "ko-KR":
-                text = "이미지 분류를 시작합니다."
-            elif language == "en-US":
-                text = "Starting image classification"
-            else:
-                text = "画像分類を開始します"
-            speech_synthesizer.speak_text_async(text)
+            tts.speak(voice_name, voice_phrases.phrase("start", language))
             time.sleep(1)
             should_stop = False
             if upload_thread is None or not upload_thread.is_alive():
@@ -308,85 +511,59 @@ def speech_recognize_continuous_async_from_microphone():
 
         elif "정지" in evt.result.text.lower() or "stop" in evt.result.text.lower() or "終了" in evt.result.text.lower():
             print("Stop classification of Image")
-            text = "이미지 분류를 정지합니다."
-            if language == "ko-KR":
-                texttranslated = text
-            elif language == "en-US":
-                src_lang = 'ko'
-                dest_lang = 'en'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang) )
-              
-            else:
-                src_lang = 'ko'
-                dest_lang = 'ja'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
-            speech_synthesizer.speak_text_async(texttranslated)
+            tts.speak(voice_name, voice_phrases.phrase("stop", language))
             should_stop = True
         
         elif "말해줘" in evt.result.text or "tell me" in evt.result.text.lower() or "教えて" in evt.result.text.lower():
             print("현재까지의 결과를 말씀드리겠습니다.")
-            countdf, pricedf = scrape_table_data()
-            counttext = countdf_to_text(countdf)
-            pricetext = pricedf_to_text(pricedf)
-            if language == "ko-KR":
-                texttranslated = "현재까지의 결과를 말씀드리겠습니다." + counttext + pricetext
-                             
-            elif language == "en-US":
-                text = "현재까지의 결과를 말씀드리겠습니다." + counttext + pricetext
-                src_lang = 'ko'
-                dest_lang = 'en'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
+            if UPLOAD_MODE in ("api", "watch"):
+                # 업로드하면서 갱신한 누적 집계를 언어별 템플릿으로 바로 문장 생성
+                reporttext = summary.count_text(language) + summary.price_text(language)
             else:
-                text = "현재까지의 결과를 말씀드리겠습니다." + counttext + pricetext 
-                src_lang = 'ko'
-                dest_lang = 'ja'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
-            speech_synthesizer.speak_text_async(texttranslated)
+                # 화면에서 긁어온 테이블 행을 코드로 바꿔서 같은 템플릿으로 문장 생성 (번역 API 호출 없음)
+                tables = scrape_table_data()
+                if tables is None:
+                    reporttext = voice_phrases.phrase("no_results", language)
+                else:
+                    countdf, pricedf = tables
+                    reporttext = (voice_phrases.count_text(countdf_to_counts(countdf), language)
+                                  + voice_phrases.price_text(pricedf_to_best_prices(pricedf), language))
+            # 안내 문구와 겹치지 않게 같은 재생 대기열로 - 요약은 매번 달라서 캐시하지 않음
+            tts.speak(voice_name, voice_phrases.phrase("report", language))
+            tts.speak(voice_name, reporttext, cache=False)
 
         if "안녕" in evt.result.text or "hello" in evt.result.text.lower() or "おい" in evt.result.text.lower():
-            text = "어서오세요. 사장님. 이미지 분류를 시작하시려면 '시작'이라고 말해주세요"
-            if language == "ko-KR":
-                texttranslated = text
-                             
-            elif language == "en-US":
-                src_lang = 'ko'
-                dest_lang = 'en'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
-            else:
-                src_lang = 'ko'
-                dest_lang = 'ja'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
-            speech_synthesizer.speak_text_async(texttranslated)
+            tts.speak(voice_name, voice_phrases.phrase("greeting", language))
 
         if "다운로드" in evt.result.text or "다운" in evt.result.text or "download" in evt.result.text.lower() or "ダウンロード" in evt.result.text :
-            text = "개수 정보와 가격 정보 파일을 다운받습니다."
-            if language == "ko-KR":
-                texttranslated = text
-                             
-            elif language == "en-US":
-                src_lang = 'ko'
-                dest_lang = 'en'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
-            else:
-                src_lang = 'ko'
-                dest_lang = 'ja'
-                texttranslated = loop.run_until_complete(translate_text(text, src_lang, dest_lang))
             click_download('개수')
             click_download('가격')
-            speech_synthesizer.speak_text_async(texttranslated)
+            tts.speak(voice_name, voice_phrases.phrase("download", language))
 
-    def stop_cb(evt: speechsdk.SessionEventArgs):
+    def stop_cb(evt: speechsdk.SessionEventArgs, lang):
         nonlocal done  # nonlocal 선언을 함수 시작 부분으로 이동
+        # 언어 전환으로 멈춘 이전 인식기의 종료 이벤트는 무시
+        if lang != listening_language:
+            return
         print('CLOSING on {}'.format(evt))
         done = True
     
-    def setup_event_handlers(recognizer):
+    def setup_event_handlers(recognizer, lang):
         recognizer.recognizing.connect(recognizing_cb)
-        recognizer.recognized.connect(recognized_cb)
-        recognizer.session_stopped.connect(stop_cb)
-        recognizer.canceled.connect(stop_cb)
-    
-    setup_event_handlers(speech_recognizer)
+        recognizer.recognized.connect(lambda evt: recognized_cb(evt, lang))
+        recognizer.session_started.connect(lambda evt: session_started_cb(lang))
+        recognizer.session_stopped.connect(lambda evt: stop_cb(evt, lang))
+        recognizer.canceled.connect(lambda evt: stop_cb(evt, lang))
+
+    # 언어별 인식기를 한 번만 만들고 서비스 연결을 미리 열어 둠 - 전환 때는 교체만 함
+    # (말하기는 모두 tts 재생 대기열로 - 언어별 스피커 합성기는 두지 않음)
+    recognizers = {}
+    for lang in (VOICE_NAMES if LANGUAGE_SWITCH_MODE == "pool" else [language]):
+        recognizers[lang] = create_speech_recognizer(lang)
+        setup_event_handlers(recognizers[lang], lang)
+        speechsdk.Connection.from_recognizer(recognizers[lang]).open(True)
+    speech_recognizer = recognizers[language]
+
     result_future = speech_recognizer.start_continuous_recognition_async()
     result_future.get()
     print('Continuous Recognition is now running. Say something...')
@@ -394,7 +571,8 @@ def speech_recognize_continuous_async_from_microphone():
     
     while not done:
         time.sleep(0.1)
-    
+
+    switch_timer.report()
     print("Recognition stopped, main thread can exit now.")
 
 
@@ -0,0 +1,87 @@
+import os
+
+import tts_cache
+import voice_phrases
+
+
+class FakeSynthesizer:
+    """Stands in for the cloud synthesizer; records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, voice, text):
+        self.calls.append((voice, text))
+        return f"RIFF {voice} {text}".encode("utf-8")
+
+
+def make_cache(tmp_path):
+    synthesize = FakeSynthesizer()
+    played = []
+
+    def play(path):
+        with open(path, "rb") as f:
+            played.append(f.read())
+
+    return tts_cache.TTSCache(synthesize, play=play, folder=str(tmp_path)), synthesize, played
+
+
+def test_miss_then_hit(tmp_path):
+    cache, synthesize, played = make_cache(tmp_path)
+    cache.speak("voice-a", "hello").result()
+    cache.speak("voice-a", "hello").result()
+    assert synthesize.calls == [("voice-a", "hello")]
+    assert played == [b"RIFF voice-a hello"] * 2
+    assert cache.stats == {'hits': 1, 'misses': 1, 'errors': 0}
+
+
+def test_voice_is_part_of_the_key(tmp_path):
+    cache, synthesize, _ = make_cache(tmp_path)
+    cache.speak("voice-a", "hello").result()
+    cache.speak("voice-b", "hello").result()
+    assert len(synthesize.calls) == 2
+
+
+def test_prewarm_synthesizes_only_missing_prompts(tmp_path):
+    cache, synthesize, played = make_cache(tmp_path)
+    prompts = [("voice-a", voice_phrases.phrase(key, "en-US")) for key in voice_phrases.FIXED_PROMPTS]
+    assert cache.prewarm(prompts) == len(prompts)
+    assert cache.prewarm(prompts) == 0
+    assert len(synthesize.calls) == len(prompts)
+
+    cache.speak(*prompts[0]).result()
+    assert len(synthesize.calls) == len(prompts)
+    assert cache.stats['hits'] == 1
+    assert played == [f"RIFF voice-a {prompts[0][1]}".encode("utf-8")]
+
+
+def test_uncached_text_is_played_and_removed(tmp_path):
+    cache, synthesize, played = make_cache(tmp_path)
+    cache.speak("voice-a", "3 fresh apple.", cache=False).result()
+    cache.speak("voice-a", "3 fresh apple.", cache=False).result()
+    assert len(synthesize.calls) == 2
+    assert played == [b"RIFF voice-a 3 fresh apple."] * 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_playback_keeps_request_order(tmp_path):
+    cache, _, played = make_cache(tmp_path)
+    futures = [cache.speak("voice-a", "report"), cache.speak("voice-a", "summary", cache=False),
+               cache.speak("voice-a", "stop")]
+    for future in futures:
+        future.result()
+    assert played == [b"RIFF voice-a report", b"RIFF voice-a summary", b"RIFF voice-a stop"]
+
+
+def test_synthesis_error_is_counted(tmp_path):
+    def broken(voice, text):
+        raise RuntimeError("service unavailable")
+
+    cache = tts_cache.TTSCache(broken, play=lambda path: None, folder=str(tmp_path))
+    cache.speak("voice-a", "hello").result()
+    assert cache.stats['errors'] == 1
+    assert cache.prewarm([("voice-a", "hello")]) == 0
+    assert cache.stats['errors'] == 2
+    cache.speak("voice-a", "3 fresh apple.", cache=False).result()
+    assert cache.stats['errors'] == 3
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,120 @@
+import concurrent.futures
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+
+# 음성 합성 결과(WAV) 디스크 캐시 - (목소리, 문장) 이 같으면 클라우드 합성 없이 저장된 파일을 바로 재생
+# 고정 안내 문구는 시작할 때 미리 합성해 둠 (prewarm)
+# 합성/재생 함수는 생성자로 받아서, 테스트에서는 가짜 합성기를 넣어 쓸 수 있음
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "tts_cache")
+
+
+def play_wav(path):
+    """Play a WAV file to the default speaker and wait until it ends"""
+    try:
+        import winsound
+    except ImportError:
+        winsound = None
+    if winsound is not None:
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+        return
+    for player in ("afplay", "aplay", "paplay"):
+        if shutil.which(player):
+            subprocess.run([player, path], check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return
+    print(f"❌ No audio player found for {path}")
+
+
+class TTSCache:
+    """speak(voice, text) plays cached audio, synthesizing and storing it on a miss.
+
+    synthesize(voice, text) -> WAV bytes; play(path) plays one file.
+    """
+
+    def __init__(self, synthesize, play=play_wav, folder=TTS_CACHE_DIR):
+        self.synthesize = synthesize
+        self.play = play
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0}
+        # 안내 문구가 겹치지 않고 말한 순서대로 나오도록 재생은 한 스레드에서
+        self._speaker = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def path(self, voice, text):
+        key = hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, f"{key}.wav")
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def audio_path(self, voice, text):
+        """Path of the cached audio, synthesizing it first on a miss"""
+        path = self.path(voice, text)
+        if os.path.exists(path):
+            self._count('hits')
+            return path
+        self._count('misses')
+        audio = self.synthesize(voice, text)
+        # 임시 파일에 쓴 뒤 이름을 바꿔서 재생 중에 반쯤 쓰인 파일을 읽지 않게 함
+        partial = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(partial, "wb") as f:
+            f.write(audio)
+        os.replace(partial, path)
+        return path
+
+    def _play_once(self, voice, text):
+        # 매번 바뀌는 문장(결과 요약 등)은 캐시에 남기지 않고 재생 후 지움
+        audio = self.synthesize(voice, text)  # 합성에 실패하면 파일을 만들지 않음
+        path = os.path.join(self.folder, f"{uuid.uuid4().hex}.once.wav")
+        try:
+            with open(path, "wb") as f:
+                f.write(audio)
+            self.play(path)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _speak(self, voice, text, cache):
+        try:
+            if cache:
+                self.play(self.audio_path(voice, text))
+            else:
+                self._play_once(voice, text)
+        except Exception as e:
+            self._count('errors')
+            print(f"❌ Error speaking '{text}': {e}")
+
+    def speak(self, voice, text, cache=True):
+        """Queue text for playback and return immediately (like speak_text_async).
+
+        cache=False synthesizes one-off text without storing it; it still waits
+        its turn behind earlier prompts.
+        """
+        return self._speaker.submit(self._speak, voice, text, cache)
+
+    def prewarm(self, prompts):
+        """Synthesize every missing (voice, text) pair; returns how many were generated"""
+        generated = 0
+        for voice, text in prompts:
+            if os.path.exists(self.path(voice, text)):
+                continue
+            try:
+                self.audio_path(voice, text)
+                generated += 1
+            except Exception as e:
+                self._count('errors')
+                print(f"❌ Error prewarming '{text}' ({voice}): {e}")
+        return generated
+
+    def prewarm_async(self, prompts):
+        thread = threading.Thread(target=self.prewarm, args=(list(prompts),), daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self._speaker.shutdown(wait=True)
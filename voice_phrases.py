@@ -0,0 +1,131 @@
+# 음성 안내 문구 - 고정 문구는 언어별로 미리 준비하고, 개수/가격 요약은 언어별 템플릿으로 생성
+# (번역 API 를 부르지 않으므로 말하는 속도가 네트워크에 좌우되지 않음)
+PHRASES = {
+    'switched': {
+        'ko-KR': "한국어 모드로 전환되었습니다",
+        'en-US': "Switched to English mode",
+        'ja-JP': "日本語モードに切り替えました",
+    },
+    'start': {
+        'ko-KR': "이미지 분류를 시작합니다.",
+        'en-US': "Starting image classification",
+        'ja-JP': "画像分類を開始します",
+    },
+    'stop': {
+        'ko-KR': "이미지 분류를 정지합니다.",
+        'en-US': "Stopping image classification.",
+        'ja-JP': "画像分類を停止します。",
+    },
+    'report': {
+        'ko-KR': "현재까지의 결과를 말씀드리겠습니다.",
+        'en-US': "Here are the results so far. ",
+        'ja-JP': "これまでの結果をお伝えします。",
+    },
+    'greeting': {
+        'ko-KR': "어서오세요. 사장님. 이미지 분류를 시작하시려면 '시작'이라고 말해주세요",
+        'en-US': "Welcome, boss. To start image classification, please say 'start'.",
+        'ja-JP': "いらっしゃいませ、社長。画像分類を始めるには「開始」と言ってください。",
+    },
+    'download': {
+        'ko-KR': "개수 정보와 가격 정보 파일을 다운받습니다.",
+        'en-US': "Downloading the count and price files.",
+        'ja-JP': "個数情報と価格情報のファイルをダウンロードします。",
+    },
+    'no_results': {
+        'ko-KR': "아직 분류된 이미지가 없습니다.",
+        'en-US': "No images have been classified yet.",
+        'ja-JP': "まだ分類された画像はありません。",
+    },
+}
+
+# 단독으로 말하는 고정 문구 (음성 클라이언트 시작 시 미리 합성)
+FIXED_PROMPTS = ('switched', 'start', 'stop', 'report', 'greeting', 'download')
+
+# 요약 템플릿
+TEMPLATES = {
+    'count_item': {
+        'ko-KR': "{condition} {product} {count}개",
+        'en-US': "{count} {condition} {product}",
+        'ja-JP': "{condition}{product}{count}個",
+    },
+    'count_summary': {
+        'ko-KR': "{items}입니다.",
+        'en-US': "{items}. ",
+        'ja-JP': "{items}です。",
+    },
+    'price': {
+        'ko-KR': "{condition} {product}의 경우, {unit} 단위로 판매되고 있으며 "
+                 "현재 {regions}에서 가장 높은 도매가격 {price}원에 거래되고 있습니다.",
+        'en-US': "The {condition} {product} is sold per {unit}, "
+                 "and the highest wholesale price is {price} won in {regions}.",
+        'ja-JP': "{condition}{product}は{unit}単位で販売されており、"
+                 "現在{regions}で最も高い卸売価格{price}ウォンで取引されています。",
+    },
+}
+LIST_SEPARATORS = {'ko-KR': ", ", 'en-US': ", ", 'ja-JP': "、"}
+
+PRODUCT_NAMES = {
+    'ko-KR': {'apple': '사과', 'banana': '바나나', 'carrot': '당근', 'cucumber': '오이',
+              'mango': '망고', 'bellpepper': '파프리카', 'orange': '오렌지', 'potato': '감자',
+              'strawberry': '딸기', 'tomato': '토마토'},
+    'en-US': {'apple': 'apple', 'banana': 'banana', 'carrot': 'carrot', 'cucumber': 'cucumber',
+              'mango': 'mango', 'bellpepper': 'bell pepper', 'orange': 'orange', 'potato': 'potato',
+              'strawberry': 'strawberry', 'tomato': 'tomato'},
+    'ja-JP': {'apple': 'りんご', 'banana': 'バナナ', 'carrot': 'ニンジン', 'cucumber': 'キュウリ',
+              'mango': 'マンゴー', 'bellpepper': 'パプリカ', 'orange': 'オレンジ', 'potato': 'じゃがいも',
+              'strawberry': 'いちご', 'tomato': 'トマト'},
+}
+CONDITION_NAMES = {
+    'ko-KR': {'fr': '신선한', 'low': '저품질', 'rot': '버릴'},
+    'en-US': {'fr': 'fresh', 'low': 'low-quality', 'rot': 'rotten'},
+    'ja-JP': {'fr': '新鮮な', 'low': '低品質の', 'rot': '廃棄する'},
+}
+# KAMIS 응답의 지역/단위는 한글
+REGION_NAMES = {
+    'en-US': {'서울': 'Seoul', '부산': 'Busan', '대구': 'Daegu', '광주': 'Gwangju', '대전': 'Daejeon'},
+    'ja-JP': {'서울': 'ソウル', '부산': '釜山', '대구': '大邱', '광주': '光州', '대전': '大田'},
+}
+UNIT_NAMES = {
+    'en-US': {'100개': '100 pieces'},
+    'ja-JP': {'100개': '100個'},
+}
+
+
+def phrase(key, language):
+    """Fixed prompt in the given recognition language (Korean if unknown)"""
+    texts = PHRASES[key]
+    return texts.get(language, texts['ko-KR'])
+
+
+def _template(key, language):
+    return TEMPLATES[key].get(language, TEMPLATES[key]['ko-KR'])
+
+
+def count_text(counts, language):
+    """counts: [((product, condition), count), ...]"""
+    if not counts:
+        return phrase('no_results', language)
+    products = PRODUCT_NAMES.get(language, PRODUCT_NAMES['ko-KR'])
+    conditions = CONDITION_NAMES.get(language, CONDITION_NAMES['ko-KR'])
+    item = _template('count_item', language)
+    items = [item.format(condition=conditions.get(condition, condition), product=products.get(product, product),
+                         count=count)
+             for (product, condition), count in counts]
+    return _template('count_summary', language).format(items=LIST_SEPARATORS.get(language, ", ").join(items))
+
+
+def price_text(best_prices, language):
+    """best_prices: [((product, condition), (price, [regions], unit)), ...]"""
+    products = PRODUCT_NAMES.get(language, PRODUCT_NAMES['ko-KR'])
+    conditions = CONDITION_NAMES.get(language, CONDITION_NAMES['ko-KR'])
+    regions_names = REGION_NAMES.get(language, {})
+    units = UNIT_NAMES.get(language, {})
+    separator = LIST_SEPARATORS.get(language, ", ")
+    sentence = _template('price', language)
+    return ''.join(
+        sentence.format(condition=conditions.get(condition, condition), product=products.get(product, product),
+                        unit=units.get(unit, unit), price=f"{price:,}",
+                        regions=separator.join(regions_names.get(region, region) for region in regions)) + ' '
+        for (product, condition), (price, regions, unit) in best_prices
+    )
+